@@ -0,0 +1,14 @@
+"""ASGI entry point for the async read API (uvicorn asgi:app)"""
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_path = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_path))
+
+# Import the Starlette app
+from app_async import app
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app)
@@ -0,0 +1,253 @@
+"""
+Incrementally maintained trade aggregates
+
+Trade write routes take a snapshot of the trade before and after they change
+it and hand both to apply_trade_change() inside the same session, so the
+aggregate rows commit (or roll back) together with the trade itself.
+
+Aggregate rows are unique per scope (NO_ACCOUNT stands in for "no
+account"), so concurrent writers that both create the same row cannot
+leave duplicates behind: the loser's INSERT fails and it updates instead.
+"""
+from sqlalchemy import func, case, Date
+from sqlalchemy.exc import IntegrityError
+from models import Trade, AccountStats, DailyPnl, NO_ACCOUNT
+
+
+def snapshot_values(account_id, status, pnl, closed_at):
+    """Build an aggregate snapshot from raw trade column values"""
+    return {
+        'account_id': account_id,
+        'status': status or 'OPEN',
+        'pnl': pnl or 0,
+        'closed_date': closed_at.date() if closed_at else None
+    }
+
+
+def snapshot_trade(trade):
+    """Capture the fields of a trade that feed the aggregates"""
+    if trade is None:
+        return None
+    return snapshot_values(trade.account_id, trade.status, trade.pnl, trade.closed_at)
+
+
+def _stats_delta(snapshot, sign):
+    """Contribution of a single trade snapshot to an AccountStats row"""
+    closed = snapshot['status'] == 'CLOSED'
+    return {
+        'closed_trades': sign * int(closed),
+        'open_trades': sign * int(snapshot['status'] == 'OPEN'),
+        'winning_trades': sign * int(closed and snapshot['pnl'] > 0),
+        'total_pnl': sign * (snapshot['pnl'] if closed else 0)
+    }
+
+
+def _daily_delta(snapshot, sign):
+    """Contribution of a single trade snapshot to a DailyPnl row"""
+    if snapshot['status'] != 'CLOSED' or snapshot['closed_date'] is None:
+        return None
+    return {
+        'pnl': sign * snapshot['pnl'],
+        'trade_count': sign,
+        'wins': sign * int(snapshot['pnl'] > 0),
+        'losses': sign * int(snapshot['pnl'] < 0)
+    }
+
+
+def _merge(deltas, key, delta):
+    current = deltas.setdefault(key, dict.fromkeys(delta, 0))
+    for field, value in delta.items():
+        current[field] += value
+
+
+def _account(account_id):
+    return NO_ACCOUNT if account_id is None else account_id
+
+
+def _upsert(db, model, scope, delta):
+    """Add a delta to the model row identified by scope, creating it if needed
+
+    The INSERT runs in a savepoint: if a concurrent transaction created the
+    row first, the unique scope index rejects it and the row is updated.
+    """
+    query = db.query(model).filter_by(**scope)
+    increments = {getattr(model, field): getattr(model, field) + value
+                  for field, value in delta.items()}
+    if query.update(increments, synchronize_session=False):
+        return
+    try:
+        with db.begin_nested():
+            db.add(model(**scope, **delta))
+    except IntegrityError:
+        query.update(increments, synchronize_session=False)
+
+
+def _apply_stats_delta(db, is_global, account_id, delta):
+    """Add a delta to one AccountStats row, creating the row if needed"""
+    if any(delta.values()):
+        _upsert(db, AccountStats, {'is_global': is_global, 'account_id': _account(account_id)}, delta)
+
+
+def _apply_daily_delta(db, account_id, day, delta):
+    """Add a delta to one DailyPnl row, creating the row if needed"""
+    if any(delta.values()):
+        _upsert(db, DailyPnl, {'account_id': _account(account_id), 'date': day}, delta)
+
+
+def apply_trade_change(db, before, after):
+    """Fold the difference between two trade snapshots into the aggregates
+
+    Pass before=None for a newly created trade and after=None for a deleted
+    one. The caller is responsible for committing the session.
+    """
+    apply_trade_changes(db, [(before, after)])
+
+
+def apply_trade_changes(db, changes):
+    """Batch form of apply_trade_change() for (before, after) pairs
+
+    Deltas are merged first, so each touched aggregate row gets a single
+    UPDATE no matter how many trades the batch contains.
+    """
+    stats_deltas = {}
+    daily_deltas = {}
+    pairs = ((snapshot, sign) for before, after in changes
+             for snapshot, sign in ((before, -1), (after, 1)))
+    for snapshot, sign in pairs:
+        if snapshot is None:
+            continue
+        delta = _stats_delta(snapshot, sign)
+        _merge(stats_deltas, (True, None), delta)
+        _merge(stats_deltas, (False, snapshot['account_id']), delta)
+
+        delta = _daily_delta(snapshot, sign)
+        if delta:
+            _merge(daily_deltas, (snapshot['account_id'], snapshot['closed_date']), delta)
+
+    for (is_global, account_id), delta in stats_deltas.items():
+        _apply_stats_delta(db, is_global, account_id, delta)
+    for (account_id, day), delta in daily_deltas.items():
+        _apply_daily_delta(db, account_id, day, delta)
+
+
+def get_account_stats_row(db, account_id=None):
+    """Return the aggregate row for one account, or the global row"""
+    return db.query(AccountStats).filter_by(
+        is_global=account_id is None, account_id=_account(account_id)
+    ).first()
+
+
+def rebuild_account_stats(db):
+    """Recompute every AccountStats row from the trades table"""
+    is_closed = Trade.status == 'CLOSED'
+    rows = db.query(
+        Trade.account_id,
+        func.count(case((is_closed, 1))),
+        func.count(case((Trade.status == 'OPEN', 1))),
+        func.count(case((is_closed & (Trade.pnl > 0), 1))),
+        func.coalesce(func.sum(case((is_closed, Trade.pnl), else_=0)), 0)
+    ).group_by(Trade.account_id).all()
+
+    db.query(AccountStats).delete(synchronize_session=False)
+
+    totals = dict(closed_trades=0, open_trades=0, winning_trades=0, total_pnl=0)
+    for account_id, closed, open_, winning, pnl in rows:
+        values = dict(closed_trades=closed, open_trades=open_,
+                      winning_trades=winning, total_pnl=pnl)
+        db.add(AccountStats(is_global=False, account_id=_account(account_id), **values))
+        for field, value in values.items():
+            totals[field] += value
+    db.add(AccountStats(is_global=True, account_id=NO_ACCOUNT, **totals))
+
+    db.commit()
+    return len(rows)
+
+
+def query_daily_pnl(db, start_date=None, end_date=None, account_id=None):
+    """Return (date, pnl, trade_count) per day with at least one closed trade"""
+    query = db.query(
+        DailyPnl.date,
+        func.sum(DailyPnl.pnl),
+        func.sum(DailyPnl.trade_count)
+    )
+    if start_date is not None:
+        query = query.filter(DailyPnl.date >= start_date)
+    if end_date is not None:
+        query = query.filter(DailyPnl.date < end_date)
+    if account_id is not None:
+        query = query.filter(DailyPnl.account_id == account_id)
+
+    return query.group_by(DailyPnl.date).having(
+        func.sum(DailyPnl.trade_count) > 0
+    ).order_by(DailyPnl.date).all()
+
+
+def rebuild_daily_pnl(db):
+    """Recompute every DailyPnl row from the trades table"""
+    day = func.date(Trade.closed_at, type_=Date)
+    rows = db.query(
+        Trade.account_id,
+        day,
+        func.coalesce(func.sum(Trade.pnl), 0),
+        func.count(Trade.id),
+        func.count(case((Trade.pnl > 0, 1))),
+        func.count(case((Trade.pnl < 0, 1)))
+    ).filter(
+        Trade.status == 'CLOSED',
+        Trade.closed_at.isnot(None)
+    ).group_by(Trade.account_id, day).all()
+
+    db.query(DailyPnl).delete(synchronize_session=False)
+    db.add_all([
+        DailyPnl(account_id=_account(account_id), date=date, pnl=pnl,
+                 trade_count=count, wins=wins, losses=losses)
+        for account_id, date, pnl, count, wins, losses in rows
+    ])
+
+    db.commit()
+    return len(rows)
+
+
+def _has_null_accounts(db, model):
+    """Rows written before NO_ACCOUNT replaced NULL account ids"""
+    return db.query(model.id).filter(model.account_id.is_(None)).first() is not None
+
+
+def _create_unique_indexes(db, model, rebuild):
+    """Create the model's unique scope index if an older schema lacks it
+
+    create_tables() skips it while duplicate rows (from before the index)
+    exist; rebuilding the aggregate clears them.
+    """
+    for index in model.__table__.indexes:
+        if not index.unique:
+            continue
+        try:
+            index.create(bind=db.get_bind(), checkfirst=True)
+        except IntegrityError:
+            db.rollback()
+            rebuild(db)
+            index.create(bind=db.get_bind(), checkfirst=True)
+
+
+def ensure_aggregates(db):
+    """Build the aggregates once if they have never been computed
+
+    Also converts rows from before NO_ACCOUNT. When several workers start
+    at once, the unique scope index lets only one rebuild commit; the
+    others roll back and keep its rows.
+    """
+    try:
+        if get_account_stats_row(db) is None or _has_null_accounts(db, AccountStats):
+            rebuild_account_stats(db)
+    except IntegrityError:
+        db.rollback()
+    _create_unique_indexes(db, AccountStats, rebuild_account_stats)
+
+    try:
+        has_closed = db.query(Trade.id).filter(Trade.status == 'CLOSED').first()
+        if (has_closed and db.query(DailyPnl.id).first() is None) or _has_null_accounts(db, DailyPnl):
+            rebuild_daily_pnl(db)
+    except IntegrityError:
+        db.rollback()
+    _create_unique_indexes(db, DailyPnl, rebuild_daily_pnl)
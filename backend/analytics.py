@@ -0,0 +1,137 @@
+"""
+Vectorized trade analytics
+
+Closed-trade columns from TradeRepository.closed_trade_rows() are turned
+into NumPy arrays once and every metric (equity curve, drawdown,
+Sharpe/Sortino, expectancy, R-multiples) is computed with array operations
+instead of per-trade Python loops.
+"""
+import numpy as np
+from repository import CONTRACT_SIZE, STARTING_BALANCE
+
+TRADING_DAYS_PER_YEAR = 252
+R_BUCKET_EDGES = np.array([-3, -2, -1, 0, 1, 2, 3])
+
+
+def closed_trade_arrays(rows):
+    """Arrays from (pnl, closed_at, entry_price, stop_loss, lot_size) rows in close order"""
+    rows = list(rows)
+    if not rows:
+        return {
+            'pnl': np.empty(0),
+            'closed_at': np.empty(0, dtype='datetime64[s]'),
+            'risk': np.empty(0)
+        }
+
+    pnl, closed_at, entry, stop, lots = zip(*rows)
+    entry = np.array(entry, dtype=float)
+    # stop_loss is optional; NaN marks trades without a defined 1R
+    stop = np.array([np.nan if s is None else s for s in stop], dtype=float)
+    lots = np.array(lots, dtype=float)
+
+    return {
+        'pnl': np.nan_to_num(np.array(pnl, dtype=float)),
+        'closed_at': np.array(closed_at, dtype='datetime64[s]'),
+        'risk': np.abs(entry - stop) * lots * CONTRACT_SIZE
+    }
+
+
+def equity_curve(pnl, starting_balance):
+    """Account equity after each trade"""
+    return starting_balance + np.cumsum(pnl)
+
+
+def max_drawdown(equity, starting_balance):
+    """Largest peak-to-trough fall of the equity curve, absolute and in %"""
+    if equity.size == 0:
+        return 0.0, 0.0
+    peaks = np.maximum.accumulate(np.concatenate(([starting_balance], equity)))[1:]
+    drawdowns = equity - peaks
+    worst = int(np.argmin(drawdowns))
+    if drawdowns[worst] >= 0:
+        return 0.0, 0.0
+    return float(-drawdowns[worst]), float(-drawdowns[worst] / peaks[worst] * 100)
+
+
+def daily_series(closed_at, pnl, equity):
+    """Per-day P&L and end-of-day equity (closed_at must be sorted)"""
+    days = closed_at.astype('datetime64[D]')
+    first_index = np.flatnonzero(np.concatenate(([True], days[1:] != days[:-1])))
+    unique_days = days[first_index]
+    daily_pnl = np.add.reduceat(pnl, first_index)
+    last_index = np.append(first_index[1:], days.size) - 1
+    return unique_days, daily_pnl, equity[last_index]
+
+
+def risk_ratios(daily_pnl, daily_equity):
+    """Annualised Sharpe and Sortino ratios from daily returns"""
+    if daily_pnl.size < 2:
+        return 0.0, 0.0
+
+    opening_equity = daily_equity - daily_pnl
+    returns = np.divide(daily_pnl, opening_equity,
+                        out=np.zeros_like(daily_pnl), where=opening_equity != 0)
+    mean = returns.mean()
+    annualise = np.sqrt(TRADING_DAYS_PER_YEAR)
+
+    std = returns.std(ddof=1)
+    sharpe = mean / std * annualise if std > 0 else 0.0
+
+    downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2))
+    sortino = mean / downside * annualise if downside > 0 else 0.0
+    return float(sharpe), float(sortino)
+
+
+def r_multiples(pnl, risk):
+    """R-multiple per trade for trades with a stop loss (1R = risk at stop)"""
+    defined = np.isfinite(risk) & (risk > 0)
+    return pnl[defined] / risk[defined]
+
+
+def r_distribution(r):
+    """Bucket R-multiples into fixed bands"""
+    labels = ['< -3R'] + [
+        f'{low}R to {high}R' for low, high in zip(R_BUCKET_EDGES[:-1], R_BUCKET_EDGES[1:])
+    ] + ['>= 3R']
+    counts = np.bincount(np.digitize(r, R_BUCKET_EDGES), minlength=len(labels))
+    return [{'bucket': label, 'count': int(count)} for label, count in zip(labels, counts)]
+
+
+def compute_advanced_metrics(trades, starting_balance=STARTING_BALANCE):
+    """All advanced metrics for arrays returned by closed_trade_arrays()"""
+    pnl = trades['pnl']
+    if pnl.size == 0:
+        return {
+            'total_trades': 0,
+            'expectancy': 0,
+            'max_drawdown': 0,
+            'max_drawdown_pct': 0,
+            'sharpe_ratio': 0,
+            'sortino_ratio': 0,
+            'average_r': 0,
+            'trades_with_r': 0,
+            'r_distribution': r_distribution(np.empty(0)),
+            'equity_curve': []
+        }
+
+    equity = equity_curve(pnl, starting_balance)
+    drawdown, drawdown_pct = max_drawdown(equity, starting_balance)
+    days, daily_pnl, daily_equity = daily_series(trades['closed_at'], pnl, equity)
+    sharpe, sortino = risk_ratios(daily_pnl, daily_equity)
+    r = r_multiples(pnl, trades['risk'])
+
+    return {
+        'total_trades': int(pnl.size),
+        'expectancy': round(float(pnl.mean()), 2),
+        'max_drawdown': round(drawdown, 2),
+        'max_drawdown_pct': round(drawdown_pct, 2),
+        'sharpe_ratio': round(sharpe, 2),
+        'sortino_ratio': round(sortino, 2),
+        'average_r': round(float(r.mean()), 2) if r.size else 0,
+        'trades_with_r': int(r.size),
+        'r_distribution': r_distribution(r),
+        'equity_curve': [
+            {'date': day, 'equity': value}
+            for day, value in zip(days.astype(str).tolist(), np.round(daily_equity, 2).tolist())
+        ]
+    }
@@ -0,0 +1,13 @@
+"""
+Enhanced API routes
+
+Endpoints generated with `python manage.py add-endpoint` are inserted
+above the return statement in register_enhanced_routes().
+"""
+from flask import jsonify
+from database import get_request_db
+
+
+def register_enhanced_routes(app):
+    """Register additional API routes on the Flask app"""
+    return app
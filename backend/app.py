@@ -1,9 +1,18 @@
-from flask import Flask, request, jsonify, send_from_directory, send_file
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
-from models import Trade, Video, TradingAccount, TradingStrategy, TradeTag, TradeImage
-from database import db_config, get_db
+from models import Video, TradingAccount, TradingStrategy, TradeTag, TradeImage
+from database import db_config, get_request_db, get_request_read_db
+from etags import register_conditional_get, bump_data_version, VERSIONED_PREFIXES
+from json_provider import init_json
+from compression import register_compression
+from static_assets import register_static_assets
+from request_metrics import register_request_metrics, instrument_engine, render_metrics
+import profiler
+from aggregates import ensure_aggregates
+from stats_cache import stats_cache
+from repository import create_repository
+from trade_api import register_trade_routes
 from api_routes import register_enhanced_routes
-from datetime import datetime
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -13,49 +22,65 @@ load_dotenv()
 # Configure Flask to serve frontend files
 frontend_dir = Path(__file__).parent.parent / 'frontend'
 app = Flask(__name__, static_folder=str(frontend_dir), static_url_path='')
-CORS(app)
+init_json(app)
+CORS(app, expose_headers=['X-Next-Cursor', 'ETag'])
 
-# Create database tables
+# Per-endpoint timing, SQL and response size histograms (first, so every
+# other hook's work and short-circuit responses are included)
+register_request_metrics(app)
+
+# Opt-in sampling profiler (PROFILE_ENABLED or /api/admin/profiling)
+profiler.register_profiler(app)
+
+# gzip/brotli for API responses
+register_compression(app)
+
+# Fingerprinted frontend assets from a manifest built at startup
+serve_asset = register_static_assets(app)
+
+# Trade storage backend (TRADE_BACKEND=sql|json|mongo)
+trade_repository = create_repository()
+
+# Create database tables and close sessions at the end of each request
+# (videos, accounts and the enhanced API use SQL whatever the trade backend)
 db_config.create_tables()
+db_config.init_app(app)
+instrument_engine(db_config.engine)
+if db_config.read_engine is not db_config.engine:
+    instrument_engine(db_config.read_engine)
+with db_config.SessionLocal() as db:
+    ensure_aggregates(db)
 
 # Register enhanced API routes
 register_enhanced_routes(app)
 
+# ETag / If-None-Match handling for trade and video reads. Only SQL trade
+# writes bump the trades data version, so other backends skip those tags.
+if trade_repository.name == 'sql':
+    register_conditional_get(app, db_config.ReadSessionLocal)
+else:
+    register_conditional_get(app, db_config.ReadSessionLocal, [
+        (prefix, scope) for prefix, scope in VERSIONED_PREFIXES if scope != 'trades'
+    ])
+
+# Trade CRUD, import/export, statistics and dashboard snapshot routes
+register_trade_routes(app, trade_repository)
+
 # Serve frontend files
 @app.route('/')
 def serve_index():
     """Serve main dashboard"""
-    return send_from_directory(app.static_folder, 'index.html')
+    return serve_asset('index.html')
 
 @app.route('/admin.html')
 def serve_admin():
     """Serve admin panel"""
-    return send_from_directory(app.static_folder, 'admin.html')
+    return serve_asset('admin.html')
 
 @app.route('/<path:path>')
 def serve_static_files(path):
-    """Serve static files (CSS, JS, etc.)"""
-    try:
-        return send_from_directory(app.static_folder, path)
-    except:
-        # If file not found, serve index.html (for SPA routing)
-        return send_from_directory(app.static_folder, 'index.html')
-
-def calculate_pnl(trade):
-    """Calculate P&L for a trade"""
-    if not trade.exit_price:
-        return 0
-    
-    if trade.direction == 'LONG':
-        pnl = (trade.exit_price - trade.entry_price) * trade.lot_size * 100000
-    else:  # SHORT
-        pnl = (trade.entry_price - trade.exit_price) * trade.lot_size * 100000
-    
-    return round(pnl, 2)
-
-def calculate_confluence(weekly, daily, h4, h1, lower):
-    """Calculate total confluence from individual timeframes"""
-    return round((weekly + daily + h4 + h1 + lower) / 5, 1)
+    """Serve static files (CSS, JS, etc.); index.html for SPA routes"""
+    return serve_asset(path)
 
 # No authentication - direct access
 
@@ -69,280 +94,77 @@ def home():
             'trades': '/api/trades',
             'account_stats': '/api/trades/stats/account',
             'metrics': '/api/trades/stats/metrics',
-            'daily_stats': '/api/trades/stats/daily'
+            'daily_stats': '/api/trades/stats/daily',
+            'dashboard_snapshot': '/api/dashboard/snapshot'
         }
     })
 
-@app.route('/api/trades', methods=['GET'])
-def get_trades():
-    db = next(get_db())
-    trades = db.query(Trade).all()
-    return jsonify([trade.to_dict() for trade in trades])
+# ============= ADMIN =============
 
-@app.route('/api/trades/<int:trade_id>', methods=['GET'])
-def get_trade(trade_id):
-    db = next(get_db())
-    trade = db.query(Trade).filter(Trade.id == trade_id).first()
-    if not trade:
-        return jsonify({'error': 'Trade not found'}), 404
-    return jsonify(trade.to_dict())
+@app.route('/api/admin/pool', methods=['GET'])
+def get_pool_stats():
+    """Connection pool usage for the worker process serving this request"""
+    stats = db_config.pool_stats()
+    stats['pid'] = os.getpid()
+    return jsonify(stats)
 
-@app.route('/api/trades', methods=['POST'])
-def create_trade():
-    db = next(get_db())
-    data = request.json
-    
-    # Calculate total confluence
-    total_confluence = calculate_confluence(
-        data.get('weekly_tf', 0),
-        data.get('daily_tf', 0),
-        data.get('h4_tf', 0),
-        data.get('h1_tf', 0),
-        data.get('lower_tf', 0)
-    )
-    
-    trade = Trade(
-        symbol=data['symbol'],
-        direction=data['direction'],
-        entry_price=data['entry_price'],
-        exit_price=data.get('exit_price'),
-        lot_size=data['lot_size'],
-        weekly_tf=data.get('weekly_tf', 0),
-        daily_tf=data.get('daily_tf', 0),
-        h4_tf=data.get('h4_tf', 0),
-        h1_tf=data.get('h1_tf', 0),
-        lower_tf=data.get('lower_tf', 0),
-        total_confluence=total_confluence,
-        risk_reward=data.get('risk_reward'),
-        notes=data.get('notes'),
-        status='CLOSED' if data.get('exit_price') else 'OPEN'
-    )
-    
-    # Calculate P&L if exit price provided
-    if trade.exit_price:
-        trade.pnl = calculate_pnl(trade)
-        trade.closed_at = datetime.utcnow()
-    
-    db.add(trade)
-    db.commit()
-    db.refresh(trade)
-    
-    return jsonify(trade.to_dict()), 201
+@app.route('/api/admin/metrics', methods=['GET'])
+def get_request_metrics():
+    """Request, SQL and response size histograms in Prometheus text format"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
 
-@app.route('/api/trades/<int:trade_id>', methods=['PUT'])
-def update_trade(trade_id):
-    db = next(get_db())
-    trade = db.query(Trade).filter(Trade.id == trade_id).first()
-    
-    if not trade:
-        return jsonify({'error': 'Trade not found'}), 404
-    
-    data = request.json
-    
-    # Update fields
-    for field in ['symbol', 'direction', 'entry_price', 'exit_price', 'lot_size', 
-                  'weekly_tf', 'daily_tf', 'h4_tf', 'h1_tf', 'lower_tf', 
-                  'risk_reward', 'notes']:
-        if field in data:
-            setattr(trade, field, data[field])
-    
-    # Recalculate confluence
-    trade.total_confluence = calculate_confluence(
-        trade.weekly_tf, trade.daily_tf, trade.h4_tf, trade.h1_tf, trade.lower_tf
-    )
-    
-    # Update status and P&L
-    if trade.exit_price:
-        trade.status = 'CLOSED'
-        trade.pnl = calculate_pnl(trade)
-        if not trade.closed_at:
-            trade.closed_at = datetime.utcnow()
-    else:
-        trade.status = 'OPEN'
-        trade.pnl = 0
-        trade.closed_at = None
-    
-    db.commit()
-    return jsonify(trade.to_dict())
+@app.route('/api/admin/cache', methods=['GET'])
+def get_cache_stats():
+    """Stats cache size and hit/miss/eviction counters for this worker process"""
+    stats = stats_cache.stats()
+    stats['pid'] = os.getpid()
+    return jsonify(stats)
 
-@app.route('/api/trades/<int:trade_id>/close', methods=['POST'])
-def close_trade(trade_id):
-    db = next(get_db())
-    trade = db.query(Trade).filter(Trade.id == trade_id).first()
-    
-    if not trade:
-        return jsonify({'error': 'Trade not found'}), 404
-    
-    data = request.json
-    trade.exit_price = data['exit_price']
-    trade.status = 'CLOSED'
-    trade.pnl = calculate_pnl(trade)
-    trade.closed_at = datetime.utcnow()
-    
-    db.commit()
-    return jsonify(trade.to_dict())
+@app.route('/api/admin/assets', methods=['GET'])
+def get_static_assets():
+    """Frontend asset manifest: hashed URL, size and cached encodings per file"""
+    return jsonify(app.extensions['static_assets'].to_dict())
 
-@app.route('/api/trades/<int:trade_id>', methods=['DELETE'])
-def delete_trade(trade_id):
-    db = next(get_db())
-    trade = db.query(Trade).filter(Trade.id == trade_id).first()
-    
-    if not trade:
-        return jsonify({'error': 'Trade not found'}), 404
-    
-    db.delete(trade)
-    db.commit()
-    return '', 204
-
-@app.route('/api/trades/stats/account', methods=['GET'])
-def get_account_stats():
-    db = next(get_db())
-    trades = db.query(Trade).all()
-    
-    starting_balance = 100000  # Default starting balance
-    total_pnl = sum(trade.pnl for trade in trades if trade.status == 'CLOSED')
-    current_balance = starting_balance + total_pnl
-    
-    total_trades = len([t for t in trades if t.status == 'CLOSED'])
-    open_trades = len([t for t in trades if t.status == 'OPEN'])
-    winning_trades = len([t for t in trades if t.status == 'CLOSED' and t.pnl > 0])
-    
+@app.route('/api/admin/profiling', methods=['GET'])
+def get_profiling():
+    """Profiler settings and stored profiles for this worker process"""
     return jsonify({
-        'starting_balance': starting_balance,
-        'current_balance': current_balance,
-        'total_pnl': total_pnl,
-        'pnl_percentage': (total_pnl / starting_balance * 100) if starting_balance > 0 else 0,
-        'total_trades': total_trades,
-        'open_trades': open_trades,
-        'winning_trades': winning_trades,
-        'losing_trades': total_trades - winning_trades
+        **profiler.settings,
+        'pid': os.getpid(),
+        'profiles': profiler.list_profiles()
     })
 
-@app.route('/api/trades/stats/metrics', methods=['GET'])
-def get_metrics():
-    db = next(get_db())
-    closed_trades = db.query(Trade).filter(Trade.status == 'CLOSED').all()
-    
-    if not closed_trades:
-        return jsonify({
-            'profit_factor': 0,
-            'win_rate': 0,
-            'average_win': 0,
-            'average_loss': 0,
-            'largest_win': 0,
-            'largest_loss': 0,
-            'average_confluence': 0
-        })
-    
-    winning_trades = [t for t in closed_trades if t.pnl > 0]
-    losing_trades = [t for t in closed_trades if t.pnl < 0]
-    
-    gross_profit = sum(t.pnl for t in winning_trades)
-    gross_loss = abs(sum(t.pnl for t in losing_trades))
-    
-    profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0
-    win_rate = len(winning_trades) / len(closed_trades) * 100
-    
-    average_win = gross_profit / len(winning_trades) if winning_trades else 0
-    average_loss = gross_loss / len(losing_trades) if losing_trades else 0
-    
-    largest_win = max((t.pnl for t in winning_trades), default=0)
-    largest_loss = min((t.pnl for t in losing_trades), default=0)
-    
-    average_confluence = sum(t.total_confluence for t in closed_trades) / len(closed_trades)
-    
-    return jsonify({
-        'profit_factor': round(profit_factor, 2),
-        'win_rate': round(win_rate, 1),
-        'average_win': round(average_win, 2),
-        'average_loss': round(average_loss, 2),
-        'largest_win': round(largest_win, 2),
-        'largest_loss': round(largest_loss, 2),
-        'average_confluence': round(average_confluence, 1)
-    })
-
-@app.route('/api/trades/stats/daily', methods=['GET'])
-def get_daily_stats():
-    db = next(get_db())
-    closed_trades = db.query(Trade).filter(Trade.status == 'CLOSED').all()
-    
-    daily_pnl = {}
-    for trade in closed_trades:
-        if trade.closed_at:
-            date = trade.closed_at.strftime('%Y-%m-%d')
-            daily_pnl[date] = daily_pnl.get(date, 0) + trade.pnl
-    
-    return jsonify([
-        {'date': date, 'pnl': round(pnl, 2)}
-        for date, pnl in sorted(daily_pnl.items())
-    ])
+@app.route('/api/admin/profiling', methods=['POST'])
+def update_profiling():
+    """Toggle the profiler and change sample rates for this worker process
 
-@app.route('/api/trades/stats/monthly', methods=['GET'])
-def get_monthly_stats():
-    db = next(get_db())
-    year = request.args.get('year', datetime.utcnow().year, type=int)
-    month = request.args.get('month', datetime.utcnow().month, type=int)
-    
-    # Get trades for the specified month
-    from datetime import date
-    start_date = date(year, month, 1)
-    if month == 12:
-        end_date = date(year + 1, 1, 1)
-    else:
-        end_date = date(year, month + 1, 1)
-    
-    closed_trades = db.query(Trade).filter(
-        Trade.status == 'CLOSED',
-        Trade.closed_at >= start_date,
-        Trade.closed_at < end_date
-    ).all()
-    
-    # Calculate daily P&L
-    daily_pnl = {}
-    daily_trades = {}
-    for trade in closed_trades:
-        if trade.closed_at:
-            date_str = trade.closed_at.strftime('%Y-%m-%d')
-            daily_pnl[date_str] = daily_pnl.get(date_str, 0) + trade.pnl
-            daily_trades[date_str] = daily_trades.get(date_str, 0) + 1
-    
-    # Calculate monthly stats
-    total_pnl = sum(daily_pnl.values())
-    winning_days = len([pnl for pnl in daily_pnl.values() if pnl > 0])
-    losing_days = len([pnl for pnl in daily_pnl.values() if pnl < 0])
-    total_days = len(daily_pnl)
-    
-    best_day = max(daily_pnl.items(), key=lambda x: x[1]) if daily_pnl else (None, 0)
-    worst_day = min(daily_pnl.items(), key=lambda x: x[1]) if daily_pnl else (None, 0)
-    
-    return jsonify({
-        'year': year,
-        'month': month,
-        'total_pnl': round(total_pnl, 2),
-        'total_trades': len(closed_trades),
-        'trading_days': total_days,
-        'winning_days': winning_days,
-        'losing_days': losing_days,
-        'win_rate': round((winning_days / total_days * 100) if total_days > 0 else 0, 1),
-        'best_day': {'date': best_day[0], 'pnl': round(best_day[1], 2)},
-        'worst_day': {'date': worst_day[0], 'pnl': round(worst_day[1], 2)},
-        'average_daily_pnl': round(total_pnl / total_days, 2) if total_days > 0 else 0,
-        'daily_data': [
-            {
-                'date': date_str,
-                'pnl': round(pnl, 2),
-                'trades': daily_trades.get(date_str, 0)
+    Accepts enabled, sample_rate, routes ({endpoint or rule: rate}) and keep.
+    """
+    data = request.json or {}
+    try:
+        changes = {}
+        if 'enabled' in data:
+            changes['enabled'] = bool(data['enabled'])
+        if 'sample_rate' in data:
+            changes['sample_rate'] = profiler.parse_rate(data['sample_rate'])
+        if 'routes' in data:
+            changes['routes'] = {
+                route: profiler.parse_rate(rate) for route, rate in data['routes'].items()
             }
-            for date_str, pnl in sorted(daily_pnl.items())
-        ]
-    })
+        if 'keep' in data:
+            changes['keep'] = max(1, int(data['keep']))
+    except (TypeError, ValueError, AttributeError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    profiler.settings.update(changes)
+    return get_profiling()
 
 # ============= VIDEO MANAGEMENT ROUTES =============
 
 @app.route('/api/videos', methods=['GET'])
 def get_videos():
     """Get all videos"""
-    db = next(get_db())
+    db = get_request_read_db()
     category = request.args.get('category')
     featured = request.args.get('featured')
     
@@ -359,7 +181,7 @@ def get_videos():
 @app.route('/api/videos/<int:video_id>', methods=['GET'])
 def get_video(video_id):
     """Get a single video by ID"""
-    db = next(get_db())
+    db = get_request_db()
     video = db.query(Video).filter(Video.id == video_id).first()
     
     if not video:
@@ -367,6 +189,7 @@ def get_video(video_id):
     
     # Increment view count
     video.view_count += 1
+    bump_data_version(db, 'videos')
     db.commit()
     
     return jsonify(video.to_dict())
@@ -374,7 +197,7 @@ def get_video(video_id):
 @app.route('/api/videos', methods=['POST'])
 def create_video():
     """Create a new video entry"""
-    db = next(get_db())
+    db = get_request_db()
     data = request.json
     
     video = Video(
@@ -388,6 +211,7 @@ def create_video():
     )
     
     db.add(video)
+    bump_data_version(db, 'videos')
     db.commit()
     db.refresh(video)
     
@@ -396,7 +220,7 @@ def create_video():
 @app.route('/api/videos/<int:video_id>', methods=['PUT'])
 def update_video(video_id):
     """Update a video"""
-    db = next(get_db())
+    db = get_request_db()
     video = db.query(Video).filter(Video.id == video_id).first()
     
     if not video:
@@ -419,6 +243,7 @@ def update_video(video_id):
     if 'is_featured' in data:
         video.is_featured = data['is_featured']
     
+    bump_data_version(db, 'videos')
     db.commit()
     db.refresh(video)
     
@@ -427,13 +252,14 @@ def update_video(video_id):
 @app.route('/api/videos/<int:video_id>', methods=['DELETE'])
 def delete_video(video_id):
     """Delete a video"""
-    db = next(get_db())
+    db = get_request_db()
     video = db.query(Video).filter(Video.id == video_id).first()
     
     if not video:
         return jsonify({'error': 'Video not found'}), 404
     
     db.delete(video)
+    bump_data_version(db, 'videos')
     db.commit()
     
     return jsonify({'message': 'Video deleted successfully'})
@@ -0,0 +1,125 @@
+"""
+ASGI variant of the read side of the trades API
+
+Serves GET /api/trades, /api/trades/<id>, the stats endpoints and the
+dashboard snapshot on SQLAlchemy's async engine (aiosqlite/asyncpg), so one
+process can keep many dashboard requests in flight instead of blocking a
+sync worker per request. Writes stay on the Flask app (app.py), which also
+maintains the aggregates these routes read.
+
+The query code is shared with app.py: each handler runs the same
+synchronous builders through AsyncSession.run_sync().
+
+Run with: uvicorn asgi:app (see asgi.py in the project root)
+"""
+from datetime import datetime
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from models import Trade
+from database import db_config
+from pagination import InvalidQuery, list_trades
+from stats import (build_account_stats, build_metrics, build_daily_series, build_monthly_stats,
+                   build_advanced_stats, build_dashboard_snapshot)
+
+# Schema is owned by the sync app; creating it here just lets this app start first
+db_config.create_tables()
+
+engine = db_config.create_async_engine(read_only=True)
+AsyncReadSession = async_sessionmaker(engine, expire_on_commit=False)
+
+
+def _int_arg(request, name, default=None):
+    try:
+        return int(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+
+
+async def run_read(func, *args):
+    """Run a synchronous query builder on an async read session"""
+    async with AsyncReadSession() as session:
+        return await session.run_sync(func, *args)
+
+
+async def get_trades(request):
+    try:
+        items, next_cursor = await run_read(list_trades, request.query_params)
+    except InvalidQuery as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    
+    headers = {'X-Next-Cursor': next_cursor} if next_cursor else None
+    return JSONResponse(items, headers=headers)
+
+
+async def get_trade(request):
+    def load(db, trade_id):
+        trade = db.query(Trade).filter(Trade.id == trade_id).first()
+        return trade.to_dict() if trade else None
+    
+    trade = await run_read(load, request.path_params['trade_id'])
+    if trade is None:
+        return JSONResponse({'error': 'Trade not found'}, status_code=404)
+    return JSONResponse(trade)
+
+
+async def get_account_stats(request):
+    return JSONResponse(await run_read(build_account_stats, _int_arg(request, 'account_id')))
+
+
+async def get_metrics(request):
+    return JSONResponse(await run_read(build_metrics, _int_arg(request, 'account_id')))
+
+
+async def get_daily_stats(request):
+    return JSONResponse(await run_read(build_daily_series, _int_arg(request, 'account_id')))
+
+
+async def get_advanced_stats(request):
+    return JSONResponse(await run_read(build_advanced_stats, _int_arg(request, 'account_id')))
+
+
+async def get_monthly_stats(request):
+    now = datetime.utcnow()
+    return JSONResponse(await run_read(
+        build_monthly_stats,
+        _int_arg(request, 'year', now.year),
+        _int_arg(request, 'month', now.month),
+        _int_arg(request, 'account_id')
+    ))
+
+
+async def get_dashboard_snapshot(request):
+    try:
+        snapshot = await run_read(
+            build_dashboard_snapshot, _int_arg(request, 'account_id'),
+            request.query_params.get('limit'), request.query_params.get('cursor')
+        )
+    except InvalidQuery as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    return JSONResponse(snapshot)
+
+
+async def dispose_engine():
+    await engine.dispose()
+
+
+app = Starlette(
+    routes=[
+        Route('/api/trades', get_trades),
+        Route('/api/trades/stats/account', get_account_stats),
+        Route('/api/trades/stats/metrics', get_metrics),
+        Route('/api/trades/stats/daily', get_daily_stats),
+        Route('/api/trades/stats/advanced', get_advanced_stats),
+        Route('/api/trades/stats/monthly', get_monthly_stats),
+        Route('/api/trades/{trade_id:int}', get_trade),
+        Route('/api/dashboard/snapshot', get_dashboard_snapshot),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], expose_headers=['X-Next-Cursor'])
+    ],
+    on_shutdown=[dispose_engine],
+)
@@ -0,0 +1,138 @@
+"""
+Negotiated gzip/brotli compression for API responses and static files
+
+register_compression() compresses bodies of compressible types larger
+than COMPRESS_MIN_SIZE with the best encoding the client accepts; streamed
+responses (exports) are compressed chunk by chunk as they are sent, so they
+stay streamed. Static files are never compressed per request:
+precompress_static.py writes .br/.gz siblings at build time and
+send_static() serves those (static_assets uses it for files too large to
+keep in memory).
+
+Brotli for API responses needs the optional brotli package; without it
+only gzip is offered.
+"""
+import gzip
+import mimetypes
+import os
+import zlib
+from flask import request, send_from_directory
+from werkzeug.security import safe_join
+from dotenv import load_dotenv
+
+load_dotenv()
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '4'))
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'text/csv', 'text/plain', 'text/html', 'text/css', 'text/javascript',
+    'image/svg+xml',
+}
+# Encodings for responses compressed on the fly, in order of preference
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+# Precompressed sibling suffix per encoding (served even without brotli)
+STATIC_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def is_compressible(mimetype):
+    return mimetype in COMPRESSIBLE_TYPES
+
+
+def negotiate_encoding():
+    """Best encoding the client accepts, or None"""
+    return request.accept_encodings.best_match(ENCODINGS)
+
+
+def compress_bytes(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, GZIP_LEVEL)
+
+
+def _stream_compressor(encoding):
+    """(compress(chunk), finish()) for incremental compression"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+    return compressor.compress, compressor.flush
+
+
+def _compressed_stream(body, encoding):
+    compress, finish = _stream_compressor(encoding)
+    try:
+        for chunk in body:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            compressed = compress(chunk)
+            if compressed:
+                yield compressed
+        yield finish()
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+
+
+def send_static(directory, filename):
+    """send_from_directory(), preferring an up-to-date .br/.gz sibling"""
+    path = safe_join(directory, filename)
+    if path and os.path.isfile(path):
+        for encoding, suffix in STATIC_ENCODINGS:
+            if not request.accept_encodings[encoding]:
+                continue
+            try:
+                if os.path.getmtime(path + suffix) < os.path.getmtime(path):
+                    continue  # Stale: the source changed after the build
+            except OSError:
+                continue
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            response = send_from_directory(directory, filename + suffix, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+            return response
+
+    response = send_from_directory(directory, filename)
+    if is_compressible(response.mimetype):
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def register_compression(app, min_size=COMPRESS_MIN_SIZE):
+    """Compress responses on the fly
+
+    Register after request_metrics so its size histogram sees the bytes
+    actually sent. Static files are served by static_assets.
+    """
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough  # Files: see send_static()
+                or not is_compressible(response.mimetype)
+                or 'Content-Encoding' in response.headers
+                or response.status_code < 200 or response.status_code in (204, 206, 304)):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = _compressed_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            response.set_data(compress_bytes(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    return app
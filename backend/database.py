@@ -2,27 +2,148 @@
 Enhanced Database Configuration with Multiple Database Support
 """
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from flask import g
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.exc import DBAPIError, IntegrityError, TimeoutError as PoolTimeoutError
 from dotenv import load_dotenv
 
 load_dotenv()
 
 Base = declarative_base()
 
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._wait_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._wait_lock:
+                self.checkouts += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
 class DatabaseConfig:
     """Database configuration class supporting multiple database types"""
     
     def __init__(self):
         self.database_url = self._get_database_url()
-        self.engine = create_engine(
-            self.database_url,
+        self.pool_size = int(os.getenv('DB_POOL_SIZE', '5'))
+        self.max_overflow = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+        self.pool_timeout = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+        self.is_sqlite = self.database_url.startswith('sqlite')
+        self.sqlite_profile = os.getenv('SQLITE_PROFILE', 'development').lower()
+        
+        self.engine = self._create_engine(self.database_url)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        
+        # Separate read-only pool for GET/stats traffic: a replica URL, or
+        # query_only connections to the same file in SQLite production mode
+        read_url = os.getenv('DATABASE_READ_URL')
+        if read_url or (self.is_sqlite and self.sqlite_profile == 'production'):
+            self.read_engine = self._create_engine(read_url or self.database_url, read_only=True)
+        else:
+            self.read_engine = self.engine
+        self.ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.read_engine)
+    
+    def _create_engine(self, url, read_only=False):
+        """Create an engine with the configured pool (and SQLite pragmas)"""
+        engine = create_engine(
+            url,
+            poolclass=InstrumentedQueuePool,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
             pool_pre_ping=True,
             pool_recycle=300,
             echo=os.getenv('SQL_DEBUG', 'False').lower() == 'true'
         )
-        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        if url.startswith('sqlite') and self.sqlite_profile == 'production':
+            pragmas = self._sqlite_pragmas(read_only)
+            
+            @event.listens_for(engine, 'connect')
+            def set_sqlite_pragmas(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+                cursor.close()
+        return engine
+    
+    def _sqlite_pragmas(self, read_only):
+        """PRAGMAs for the SQLite production profile"""
+        pragmas = [
+            f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000'))}",
+            f"PRAGMA mmap_size={int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))}",
+            f"PRAGMA cache_size={int(os.getenv('SQLITE_CACHE_SIZE', '-65536'))}",  # negative = KiB
+            "PRAGMA synchronous=NORMAL",
+        ]
+        if read_only:
+            pragmas.append("PRAGMA query_only=ON")
+        else:
+            pragmas.insert(0, "PRAGMA journal_mode=WAL")
+        return pragmas
+    
+    def async_database_url(self, url=None):
+        """Map the configured URL onto the matching asyncio driver"""
+        url = url or self.database_url
+        drivers = (
+            ('sqlite://', 'sqlite+aiosqlite://'),
+            ('postgresql+psycopg2://', 'postgresql+asyncpg://'),
+            ('postgresql://', 'postgresql+asyncpg://'),
+            ('postgres://', 'postgresql+asyncpg://'),
+            ('mysql+pymysql://', 'mysql+aiomysql://'),
+            ('mysql://', 'mysql+aiomysql://'),
+        )
+        for prefix, replacement in drivers:
+            if url.startswith(prefix):
+                return replacement + url[len(prefix):]
+        return url
+    
+    def create_async_engine(self, read_only=False):
+        """Async engine with the same pool settings and SQLite pragmas"""
+        from sqlalchemy.ext.asyncio import create_async_engine
+        from sqlalchemy.pool import AsyncAdaptedQueuePool
+        
+        url = os.getenv('DATABASE_READ_URL') if read_only else None
+        engine = create_async_engine(
+            self.async_database_url(url),
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_pre_ping=True,
+            pool_recycle=300,
+            echo=os.getenv('SQL_DEBUG', 'False').lower() == 'true'
+        )
+        if self.is_sqlite and self.sqlite_profile == 'production':
+            pragmas = self._sqlite_pragmas(read_only)
+            
+            @event.listens_for(engine.sync_engine, 'connect')
+            def set_sqlite_pragmas(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+                cursor.close()
+        return engine
     
     def _get_database_url(self):
         """Get database URL based on environment"""
@@ -62,8 +183,35 @@ class DatabaseConfig:
             return f"sqlite:///{db_path}"
     
     def create_tables(self):
-        """Create all database tables"""
+        """Create all database tables, and indexes missing from existing ones
+
+        create_all() skips tables that already exist, so an index added to a
+        model later would otherwise never reach existing databases.
+        """
         Base.metadata.create_all(bind=self.engine)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                try:
+                    index.create(bind=self.engine, checkfirst=True)
+                except IntegrityError:
+                    # Existing rows violate a new unique index; the owning
+                    # module repairs them (aggregates.ensure_aggregates)
+                    continue
+                except DBAPIError:
+                    # Another worker created it between the check and the CREATE
+                    if not inspect(self.engine).has_index(table.name, index.name):
+                        raise
+    
+    def begin_write(self, db):
+        """Start db's transaction holding the write lock where FOR UPDATE can't
+
+        SQLite ignores SELECT ... FOR UPDATE, so BEGIN IMMEDIATE takes the
+        database write lock before the first read instead.
+        """
+        if self.is_sqlite:
+            dbapi_connection = db.connection().connection.dbapi_connection
+            if not dbapi_connection.in_transaction:
+                dbapi_connection.execute('BEGIN IMMEDIATE')
     
     def get_db(self):
         """Get database session"""
@@ -72,6 +220,61 @@ class DatabaseConfig:
             yield db
         finally:
             db.close()
+    
+    def init_app(self, app):
+        """Close the request-scoped session when each request ends"""
+        @app.teardown_appcontext
+        def close_request_db(exc):
+            for key in ('db', 'read_db'):
+                db = g.pop(key, None)
+                if db is not None:
+                    if exc is not None:
+                        db.rollback()
+                    db.close()
+    
+    def get_request_db(self):
+        """Session shared by everything in the current request"""
+        if 'db' not in g:
+            g.db = self.SessionLocal()
+        return g.db
+    
+    def get_request_read_db(self):
+        """Read-only session for the current request (primary if no read pool)"""
+        if 'read_db' not in g:
+            g.read_db = self.ReadSessionLocal()
+        return g.read_db
+    
+    def pool_stats(self):
+        """Connection pool usage for this process"""
+        stats = self._pool_stats(self.engine)
+        if self.read_engine is not self.engine:
+            stats['read_pool'] = self._pool_stats(self.read_engine)
+        return stats
+    
+    def _pool_stats(self, engine):
+        pool = engine.pool
+        stats = {
+            'pool_class': type(pool).__name__,
+            'pool_size': self.pool_size,
+            'max_overflow': self.max_overflow,
+            'pool_timeout': self.pool_timeout,
+        }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+            })
+        if isinstance(pool, InstrumentedQueuePool):
+            with pool._wait_lock:
+                stats.update({
+                    'checkouts': pool.checkouts,
+                    'timeouts': pool.timeouts,
+                    'total_wait_ms': round(pool.total_wait * 1000, 3),
+                    'average_wait_ms': round(pool.total_wait / pool.checkouts * 1000, 3) if pool.checkouts else 0,
+                    'max_wait_ms': round(pool.max_wait * 1000, 3),
+                })
+        return stats
 
 # Global database instance
 db_config = DatabaseConfig()
@@ -80,6 +283,14 @@ def get_db():
     """Get database session - for backward compatibility"""
     return db_config.get_db()
 
+def get_request_db():
+    """Get the request-scoped session (closed automatically on teardown)"""
+    return db_config.get_request_db()
+
+def get_request_read_db():
+    """Get the request-scoped read-only session"""
+    return db_config.get_request_read_db()
+
 def create_tables():
     """Create tables - for backward compatibility"""
     return db_config.create_tables()
\ No newline at end of file
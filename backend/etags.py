@@ -0,0 +1,76 @@
+"""
+Data-version ETags and conditional GET for the trade and video APIs
+
+Write routes call bump_data_version() in the same session as their change.
+GET responses under a versioned prefix are tagged with the current version,
+and a matching If-None-Match is answered with 304 before the view runs.
+"""
+from flask import request, g
+from models import DataVersion
+
+# URL prefix -> data scope whose version validates the response
+VERSIONED_PREFIXES = (
+    ('/api/trades', 'trades'),
+    ('/api/dashboard', 'trades'),
+    ('/api/videos', 'videos'),
+)
+
+# GET endpoints with side effects that must always run
+UNCACHED_ENDPOINTS = {'get_video'}
+
+
+def get_data_version(db, scope):
+    """Current version for a scope (0 if it has never been written)"""
+    row = db.query(DataVersion.version).filter(DataVersion.name == scope).first()
+    return row[0] if row else 0
+
+
+def bump_data_version(db, scope):
+    """Increment a scope's version; the caller commits the session"""
+    updated = db.query(DataVersion).filter(DataVersion.name == scope).update(
+        {DataVersion.version: DataVersion.version + 1},
+        synchronize_session=False
+    )
+    if not updated:
+        db.add(DataVersion(name=scope, version=1))
+
+
+def _scope_for_path(path, prefixes):
+    for prefix, scope in prefixes:
+        if path.startswith(prefix):
+            return scope
+    return None
+
+
+def register_conditional_get(app, session_factory, prefixes=VERSIONED_PREFIXES):
+    """Install before/after request hooks that emit and check ETags"""
+
+    @app.before_request
+    def check_if_none_match():
+        if request.method != 'GET' or request.endpoint in UNCACHED_ENDPOINTS:
+            return None
+        scope = _scope_for_path(request.path, prefixes)
+        if scope is None:
+            return None
+
+        # Read the version before the view runs, so a concurrent write can
+        # only make the tag older than the body, never newer
+        with session_factory() as db:
+            version = get_data_version(db, scope)
+        g.etag = f"{scope}-{version}"
+
+        if request.if_none_match.contains_weak(g.etag):
+            response = app.make_response(('', 304))
+            response.set_etag(g.etag, weak=True)
+            return response
+        return None
+
+    @app.after_request
+    def set_data_etag(response):
+        etag = g.pop('etag', None)
+        if etag and response.status_code == 200:
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    return app
@@ -0,0 +1,47 @@
+"""
+Streaming CSV/NDJSON export of the trade journal
+
+Repositories hand over (columns, rows) from TradeRepository.export_trades()
+as a lazy iterable (the SQL backend reads through a server-side cursor), and
+rows are written out in small chunks, so memory use stays constant
+regardless of journal size.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+EXPORT_CHUNK_ROWS = 1000
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def iter_csv(columns, rows):
+    """Yield CSV text chunks (header first) for an iterable of rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_plain(value) for value in row])
+        if count % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def iter_ndjson(columns, rows):
+    """Yield NDJSON text chunks for an iterable of rows"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, map(_plain, row)))))
+        if len(lines) >= EXPORT_CHUNK_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+
+    if lines:
+        yield '\n'.join(lines) + '\n'
@@ -0,0 +1,202 @@
+"""
+Bulk trade import from streamed CSV or NDJSON
+
+Rows are parsed and validated one at a time as the request body is read,
+then handed to the repository in chunks: confluence, P&L and status come
+from the shared trade logic in repository.py, and each backend stores a
+chunk in one write (TradeRepository.insert_trades()).
+"""
+import csv
+import json
+import math
+import time
+from datetime import datetime, timezone
+from repository import derived_fields, WriteRejected, TIMEFRAME_FIELDS
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10000
+MAX_REPORTED_ERRORS = 1000
+
+
+class RowError(ValueError):
+    """A single import row failed validation"""
+
+
+def _decode_lines(stream, bad_lines):
+    """Decode a binary stream line by line, dropping an Excel UTF-8 BOM
+
+    A line that is not valid UTF-8 is decoded with replacement characters
+    and its number added to bad_lines, so only its row fails.
+    """
+    for number, line in enumerate(stream, start=1):
+        try:
+            yield line.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            bad_lines.add(number)
+            yield line.decode('utf-8-sig', errors='replace')
+
+
+def iter_raw_rows(stream, fmt):
+    """Yield (row_number, dict or RowError) from a binary request stream"""
+    # Servers hand over their own input objects (gunicorn's Body is not an
+    # io stream), so decode line by line rather than wrapping in TextIOWrapper
+    bad_lines = set()
+    text = _decode_lines(stream, bad_lines)
+
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        reader.fieldnames  # Read the header so line_num marks where rows start
+        end = reader.line_num
+        for number, row in enumerate(reader, start=1):
+            # A quoted field can span lines: fail the row if any of them was bad
+            start, end = end + 1, reader.line_num
+            if bad_lines.intersection(range(start, end + 1)):
+                yield number, RowError('Row is not valid UTF-8')
+            else:
+                yield number, row
+        return
+
+    for number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if number in bad_lines:
+            yield number, RowError('Line is not valid UTF-8')
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, RowError(f'Invalid JSON: {e}')
+            continue
+        if not isinstance(row, dict):
+            yield number, RowError('Each line must be a JSON object')
+            continue
+        yield number, row
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _number(row, field, required=False, cast=float):
+    value = row.get(field)
+    if _blank(value):
+        if required:
+            raise RowError(f'{field} is required')
+        return None
+    try:
+        number = cast(float(value)) if cast is int else cast(value)
+    except (TypeError, ValueError, OverflowError):
+        raise RowError(f'{field} must be a number')
+    if not math.isfinite(number):
+        raise RowError(f'{field} must be a finite number')
+    return number
+
+
+def _timestamp(row, field):
+    value = row.get(field)
+    if _blank(value):
+        return None
+    try:
+        timestamp = datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise RowError(f'{field} must be an ISO 8601 timestamp')
+    if timestamp.tzinfo is not None:
+        # Trades store naive UTC, like datetime.utcnow()
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def validate_row(row):
+    """Normalise one raw row into Trade column values (without P&L)"""
+    symbol = row.get('symbol')
+    if _blank(symbol):
+        raise RowError('symbol is required')
+
+    direction = str(row.get('direction') or '').strip().upper()
+    if direction not in ('LONG', 'SHORT'):
+        raise RowError('direction must be LONG or SHORT')
+
+    values = {
+        'symbol': str(symbol).strip(),
+        'direction': direction,
+        'entry_price': _number(row, 'entry_price', required=True),
+        'exit_price': _number(row, 'exit_price'),
+        'lot_size': _number(row, 'lot_size', required=True),
+        'account_id': _number(row, 'account_id', cast=int),
+        'risk_reward': _number(row, 'risk_reward'),
+        'notes': None if _blank(row.get('notes')) else str(row['notes']),
+        'created_at': _timestamp(row, 'created_at'),
+        'closed_at': _timestamp(row, 'closed_at')
+    }
+    for field in TIMEFRAME_FIELDS:
+        values[field] = _number(row, field, cast=int) or 0
+    return values
+
+
+def prepare_batch(rows, now=None):
+    """Compute confluence, P&L, status and timestamps for a list of rows"""
+    now = now or datetime.utcnow()
+    for row in rows:
+        row['created_at'] = row['created_at'] or now
+        row.update(derived_fields(row, now))
+    return rows
+
+
+def _store_batch(repository, batch, numbers, errors):
+    """Insert one batch and return how many rows failed to store
+
+    A batch the store rejects fails only its own rows; earlier batches
+    are already committed and later ones are still attempted.
+    """
+    try:
+        repository.insert_trades(prepare_batch(batch))
+    except WriteRejected as e:
+        rejected = range(len(batch)) if e.failed is None else e.failed
+        for index in rejected:
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'row': numbers[index], 'error': f'Not stored: {e}'})
+        return len(rejected)
+    return 0
+
+
+def import_trades(repository, stream, fmt='ndjson', batch_size=DEFAULT_BATCH_SIZE):
+    """Import trades from a stream into repository and return a summary report"""
+    started = time.perf_counter()
+    imported = 0
+    failed = 0
+    errors = []
+    batch = []
+    numbers = []
+
+    for number, row in iter_raw_rows(stream, fmt):
+        try:
+            if isinstance(row, RowError):
+                raise row
+            batch.append(validate_row(row))
+            numbers.append(number)
+        except RowError as e:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'row': number, 'error': str(e)})
+            continue
+
+        if len(batch) >= batch_size:
+            rejected = _store_batch(repository, batch, numbers, errors)
+            imported += len(batch) - rejected
+            failed += rejected
+            batch, numbers = [], []
+
+    if batch:
+        rejected = _store_batch(repository, batch, numbers, errors)
+        imported += len(batch) - rejected
+        failed += rejected
+
+    elapsed = time.perf_counter() - started
+    return {
+        'imported': imported,
+        'failed': failed,
+        'errors': errors,
+        'elapsed_seconds': round(elapsed, 3),
+        'rows_per_second': round(imported / elapsed, 1) if elapsed > 0 else 0
+    }
@@ -0,0 +1,75 @@
+"""
+Flask JSON providers: orjson when installed, the standard library otherwise
+
+Both sort keys and render dates and datetimes as ISO 8601 (the to_dict()
+format), so responses are the same whichever is active. JSON_PROVIDER
+selects one explicitly (orjson|stdlib); the default is orjson if it can be
+imported.
+"""
+import os
+from datetime import date
+from decimal import Decimal
+from flask.json.provider import JSONProvider, DefaultJSONProvider
+from dotenv import load_dotenv
+
+load_dotenv()
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto').lower()
+
+
+def _stdlib_default(o):
+    if isinstance(o, date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+def _orjson_default(o):
+    # orjson handles datetimes, dates, UUIDs and dataclasses itself
+    if isinstance(o, Decimal):
+        return str(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's default provider with ISO 8601 dates instead of HTTP dates"""
+
+    default = staticmethod(_stdlib_default)
+
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson; responses skip the str round trip"""
+
+    mimetype = 'application/json'
+    options = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_orjson_default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_orjson_default,
+                            option=self.options | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json(app, provider=JSON_PROVIDER):
+    """Install the configured JSON provider on app"""
+    if provider == 'orjson' or (provider == 'auto' and orjson is not None):
+        if orjson is None:
+            raise RuntimeError('JSON_PROVIDER=orjson but orjson is not installed')
+        app.json = OrjsonProvider(app)
+    elif provider in ('auto', 'stdlib'):
+        app.json = StdlibJSONProvider(app)
+    else:
+        raise ValueError(f"Unknown JSON_PROVIDER '{provider}' (expected auto, orjson or stdlib)")
+    return app
@@ -0,0 +1,144 @@
+"""
+JSON file trade repository backed by the in-memory TradeStore
+
+Statistics are computed in a single pass over the in-memory trades.
+"""
+from collections import defaultdict
+from datetime import datetime
+from json_store import TradeStore
+from repository import (TradeRepository, new_trade_fields, updated_trade_fields,
+                        account_summary, metrics_summary, monthly_summary, month_bounds,
+                        EXPORT_FIELDS, SNAPSHOT_PAGE_SIZE)
+
+
+def _trade_id(trade_id):
+    try:
+        return int(trade_id)
+    except (TypeError, ValueError):
+        return None
+
+
+class JsonTradeRepository(TradeRepository):
+    """Trades in a JSON snapshot + journal (see json_store.py)"""
+
+    name = 'json'
+
+    def __init__(self, data_file):
+        self.store = TradeStore(data_file)
+
+    def data_version(self):
+        return self.store.version()
+
+    def _scoped(self, account_id=None):
+        trades = self.store.all()
+        if account_id is None:
+            return trades
+        return [t for t in trades if t.get('account_id') == account_id]
+
+    def _closed_days(self, account_id=None, start=None, end=None):
+        """[(date_str, pnl, trades)] per day with closed trades, in date order"""
+        pnl = defaultdict(float)
+        counts = defaultdict(int)
+        for trade in self._scoped(account_id):
+            if trade.get('status') != 'CLOSED' or not trade.get('closed_at'):
+                continue
+            day = trade['closed_at'][:10]
+            if (start and day < start) or (end and day >= end):
+                continue
+            pnl[day] += trade.get('pnl', 0)
+            counts[day] += 1
+        return [(day, pnl[day], counts[day]) for day in sorted(pnl)]
+
+    # Trades
+
+    def list_trades(self, args):
+        # Ids are allocated in insertion order, so newest first is just reversed
+        return self.store.all()[::-1], None
+
+    def get_trade(self, trade_id):
+        return self.store.get(_trade_id(trade_id))
+
+    def create_trade(self, data):
+        trade = {'id': None}  # Assigned by the store under its write lock
+        trade.update(new_trade_fields(data, datetime.utcnow().isoformat()))
+        return self.store.insert(trade)
+
+    def update_trade(self, trade_id, data):
+        now = datetime.utcnow().isoformat()
+        return self.store.update(
+            _trade_id(trade_id),
+            lambda trade: trade.update(updated_trade_fields(trade, data, now))
+        )
+
+    def delete_trade(self, trade_id):
+        return self.store.delete(_trade_id(trade_id))
+
+    def insert_trades(self, trades):
+        for trade in trades:
+            trade['id'] = None
+            for field in ('created_at', 'closed_at'):
+                if trade[field] is not None:
+                    trade[field] = trade[field].isoformat()
+        self.store.insert_many(trades)
+
+    def export_trades(self, start=None, end=None, account_id=None):
+        def created(trade):
+            return datetime.fromisoformat(trade['created_at'])
+
+        rows = (
+            tuple(trade.get(field) for field in EXPORT_FIELDS)
+            for trade in self._scoped(account_id)
+            if (start is None or created(trade) >= start) and (end is None or created(trade) < end)
+        )
+        return EXPORT_FIELDS, rows
+
+    # Statistics
+
+    def account_stats(self, account_id=None):
+        total_pnl = 0
+        closed = opened = winning = 0
+        for trade in self._scoped(account_id):
+            if trade.get('status') == 'CLOSED':
+                closed += 1
+                total_pnl += trade.get('pnl', 0)
+                winning += trade.get('pnl', 0) > 0
+            elif trade.get('status') == 'OPEN':
+                opened += 1
+        return account_summary(total_pnl, closed, opened, winning)
+
+    def metrics(self, account_id=None):
+        closed = [t for t in self._scoped(account_id) if t.get('status') == 'CLOSED']
+        wins = [t.get('pnl', 0) for t in closed if t.get('pnl', 0) > 0]
+        losses = [t.get('pnl', 0) for t in closed if t.get('pnl', 0) < 0]
+        confluence = sum(t.get('total_confluence', 0) for t in closed)
+        return metrics_summary(
+            len(closed), len(wins), len(losses), sum(wins), sum(losses),
+            max(wins, default=0), min(losses, default=0),
+            confluence / len(closed) if closed else 0
+        )
+
+    def daily_series(self, account_id=None):
+        return [{'date': day, 'pnl': round(pnl, 2)} for day, pnl, _ in self._closed_days(account_id)]
+
+    def monthly_stats(self, year, month, account_id=None):
+        start, end = (day.isoformat() for day in month_bounds(year, month))
+        return monthly_summary(year, month, self._closed_days(account_id, start, end))
+
+    def closed_trade_rows(self, account_id=None):
+        closed = sorted(
+            (t for t in self._scoped(account_id) if t.get('status') == 'CLOSED' and t.get('closed_at')),
+            key=lambda t: (t['closed_at'], t['id'])
+        )
+        return [
+            (t.get('pnl'), datetime.fromisoformat(t['closed_at']), t['entry_price'],
+             t.get('stop_loss'), t['lot_size'])
+            for t in closed
+        ]
+
+    # Dashboard
+
+    def recent_trades(self, account_id=None, limit=SNAPSHOT_PAGE_SIZE):
+        return self._scoped(account_id)[::-1][:limit]
+
+    def open_trades(self, account_id=None):
+        return [t for t in self._scoped(account_id) if t.get('status') == 'OPEN']
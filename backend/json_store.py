@@ -0,0 +1,263 @@
+"""
+In-memory trade store with an append-only journal for the JSON backend
+
+Trades live in a dict keyed by id. Every write is appended to a journal
+file as one JSON line and fsync'd before the request returns; the full
+snapshot is only rewritten during compaction, via a temp file and an
+atomic rename, after which the journal is truncated.
+
+On startup the snapshot is loaded and the journal replayed on top of it.
+Journal records are full trade documents (or deletes by id), so replaying
+a journal that was already folded into the snapshot is harmless, and a
+torn final line left by a crash is cut off.
+
+Shared mode (JSON_STORE_SHARED=1) lets several worker processes use the
+same files. Each operation takes an flock on a sidecar .lock file (shared
+for reads, exclusive for writes) and first catches up on other workers'
+writes: journal bytes past the last known offset are replayed, and a
+bumped compaction generation number (kept in the lock file) triggers a
+full reload. Ids are allocated under the exclusive lock, so they stay
+unique across workers.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+COMPACT_EVERY = int(os.getenv('JSON_STORE_COMPACT_EVERY', '1000'))
+SHARED = os.getenv('JSON_STORE_SHARED', 'false').lower() in ('1', 'true', 'yes')
+
+
+class TradeStore:
+    """Dict-indexed trades persisted as snapshot + journal"""
+
+    def __init__(self, snapshot_path, compact_every=COMPACT_EVERY, shared=SHARED):
+        if shared and fcntl is None:
+            raise RuntimeError('Shared JSON store mode requires fcntl (POSIX only)')
+
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = self.snapshot_path.with_suffix('.journal')
+        self.lock_path = self.snapshot_path.with_suffix('.lock')
+        self.compact_every = compact_every
+        self.shared = shared
+        self._lock = threading.RLock()
+        self._lock_file = open(self.lock_path, 'a+b') if shared else None
+        self._generation = 0
+
+        with self._locked(exclusive=True, refresh=False):
+            self._load(truncate_torn=True)
+        self._journal = open(self.journal_path, 'ab')
+
+    # Loading
+
+    def _load(self, truncate_torn):
+        self._trades = {}
+        self._journal_entries = 0
+        self._journal_offset = 0
+
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                for trade in json.load(f):
+                    self._trades[trade['id']] = trade
+        self._last_id = max(self._trades, default=0)
+
+        if self.journal_path.exists():
+            self._replay_journal(truncate_torn)
+        self._generation = self._read_generation()
+
+    def _replay_journal(self, truncate_torn):
+        """Apply journal records past the last known offset"""
+        valid_bytes = self._journal_offset
+        with open(self.journal_path, 'rb') as f:
+            f.seek(valid_bytes)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(record)
+                self._journal_entries += 1
+                valid_bytes += len(line)
+        self._journal_offset = valid_bytes
+
+        # Drop a torn tail left by a crash so new appends follow valid data
+        if truncate_torn and valid_bytes < self.journal_path.stat().st_size:
+            os.truncate(self.journal_path, valid_bytes)
+
+    def _apply(self, record):
+        if record['op'] == 'put':
+            trade = record['trade']
+            self._trades[trade['id']] = trade
+            self._last_id = max(self._last_id, trade['id'])
+        elif record['op'] == 'delete':
+            self._trades.pop(record['id'], None)
+
+    # Cross-process coordination
+
+    @contextmanager
+    def _locked(self, exclusive=False, refresh=True):
+        with self._lock:
+            if not self.shared:
+                yield
+                return
+
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                if refresh:
+                    self._refresh(exclusive)
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _read_generation(self):
+        if not self.shared:
+            return 0
+        self._lock_file.seek(0)
+        raw = self._lock_file.read().strip()
+        return int(raw) if raw else 0
+
+    def _refresh(self, exclusive):
+        """Catch up with writes made by other processes (flock held)"""
+        if self._read_generation() != self._generation:
+            # Another worker compacted, so the journal we were tailing is gone
+            self._load(truncate_torn=exclusive)
+            return
+
+        # Only writers may cut a torn tail; readers just stop in front of it
+        size = self.journal_path.stat().st_size if self.journal_path.exists() else 0
+        if size != self._journal_offset:
+            self._replay_journal(truncate_torn=exclusive)
+
+    # Reads
+
+    def all(self):
+        """All trades in insertion order"""
+        with self._locked():
+            return list(self._trades.values())
+
+    def get(self, trade_id):
+        with self._locked():
+            return self._trades.get(trade_id)
+
+    def version(self):
+        """(generation, journal offset): changes with every write by any process"""
+        with self._locked():
+            return self._generation, self._journal_offset
+
+    # Writes
+
+    def insert(self, trade):
+        """Give a new trade the next free id and store it"""
+        with self._locked(exclusive=True):
+            trade['id'] = self._last_id + 1
+            self._write_put(trade)
+        return trade
+
+    def insert_many(self, trades):
+        """insert() for a batch of trades under one write lock"""
+        with self._locked(exclusive=True):
+            for trade in trades:
+                trade['id'] = self._last_id + 1
+                self._write_put(trade)
+        return trades
+
+    def put(self, trade):
+        """Insert or replace a trade (must carry its id)"""
+        with self._locked(exclusive=True):
+            self._write_put(trade)
+        return trade
+
+    def update(self, trade_id, change):
+        """Apply change(trade) to a copy of a stored trade and save it
+
+        Runs under the write lock, so concurrent updates from other workers
+        are not lost. Returns None if the trade does not exist.
+        """
+        with self._locked(exclusive=True):
+            if trade_id not in self._trades:
+                return None
+            trade = dict(self._trades[trade_id])
+            change(trade)
+            self._write_put(trade)
+        return trade
+
+    def delete(self, trade_id):
+        """Remove a trade; returns False if it did not exist"""
+        with self._locked(exclusive=True):
+            if trade_id not in self._trades:
+                return False
+            self._append({'op': 'delete', 'id': trade_id})
+            del self._trades[trade_id]
+            self._maybe_compact()
+        return True
+
+    def _write_put(self, trade):
+        self._append({'op': 'put', 'trade': trade})
+        self._trades[trade['id']] = trade
+        self._last_id = max(self._last_id, trade['id'])
+        self._maybe_compact()
+
+    def _append(self, record):
+        line = (json.dumps(record, default=str, separators=(',', ':')) + '\n').encode('utf-8')
+        self._journal.write(line)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._journal_entries += 1
+        self._journal_offset += len(line)
+
+    # Compaction
+
+    def _maybe_compact(self):
+        if self._journal_entries >= self.compact_every:
+            self._compact()
+
+    def compact(self):
+        """Write a fresh snapshot atomically, then truncate the journal"""
+        with self._locked(exclusive=True):
+            self._compact()
+
+    def _compact(self):
+        tmp_path = self.snapshot_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(list(self._trades.values()), f, default=str, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        self._fsync_dir()
+
+        # Truncate in place (not replace) so other workers' append handles stay valid
+        self._journal.truncate(0)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._journal_entries = 0
+        self._journal_offset = 0
+
+        self._generation += 1
+        if self.shared:
+            self._lock_file.seek(0)
+            self._lock_file.truncate()
+            self._lock_file.write(str(self._generation).encode())
+            self._lock_file.flush()
+
+    def _fsync_dir(self):
+        # Make the rename itself durable (not supported on Windows)
+        if hasattr(os, 'O_DIRECTORY'):
+            fd = os.open(self.snapshot_path.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def close(self):
+        with self._lock:
+            self._journal.close()
+            if self._lock_file:
+                self._lock_file.close()
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, Boolean, Text, ForeignKey, Index
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
+from serializers import model_serializer
 
 class Video(Base):
     __tablename__ = 'videos'
@@ -18,18 +19,7 @@ class Video(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'video_url': self.video_url,
-            'thumbnail_url': self.thumbnail_url,
-            'category': self.category,
-            'duration': self.duration,
-            'is_featured': self.is_featured,
-            'view_count': self.view_count,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return model_serializer(Video)(self)
 
 class Trade(Base):
     """Enhanced Trade model with new features"""
@@ -99,49 +89,16 @@ class Trade(Base):
     __table_args__ = (
         Index('idx_trade_symbol_date', 'symbol', 'created_at'),
         Index('idx_trade_status', 'status'),
+        Index('idx_trade_status_pnl', 'status', 'pnl', 'total_confluence'),
+        Index('idx_trade_created_id', 'created_at', 'id'),
         Index('idx_trade_account', 'account_id'),
     )
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'account_id': self.account_id,
-            'strategy_id': self.strategy_id,
-            'symbol': self.symbol,
-            'direction': self.direction,
-            'entry_price': self.entry_price,
-            'exit_price': self.exit_price,
-            'lot_size': self.lot_size,
-            'status': self.status,
-            'trade_type': self.trade_type,
-            'stop_loss': self.stop_loss,
-            'take_profit': self.take_profit,
-            'commission': self.commission,
-            'swap': self.swap,
-            'weekly_tf': self.weekly_tf,
-            'daily_tf': self.daily_tf,
-            'h4_tf': self.h4_tf,
-            'h1_tf': self.h1_tf,
-            'lower_tf': self.lower_tf,
-            'total_confluence': self.total_confluence,
-            'risk_reward': self.risk_reward,
-            'risk_percentage': self.risk_percentage,
-            'position_size_usd': self.position_size_usd,
-            'setup_quality': self.setup_quality,
-            'execution_quality': self.execution_quality,
-            'market_condition': self.market_condition,
-            'session': self.session,
-            'notes': self.notes,
-            'tags': self.tags,
-            'pnl': self.pnl,
-            'pnl_percentage': self.pnl_percentage,
-            'duration_minutes': self.duration_minutes,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'closed_at': self.closed_at.isoformat() if self.closed_at else None,
-            'entry_time': self.entry_time.isoformat() if self.entry_time else None,
-            'exit_time': self.exit_time.isoformat() if self.exit_time else None,
-            'images': [img.to_dict() for img in self.images] if self.images else []
-        }
+    def to_dict(self, include_images=True):
+        data = model_serializer(Trade)(self)
+        if include_images:
+            data['images'] = [img.to_dict() for img in self.images] if self.images else []
+        return data
 
 # New Models for Enhanced Features
 
@@ -163,17 +120,7 @@ class TradingAccount(Base):
     trades = relationship("Trade", back_populates="account")
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'account_type': self.account_type,
-            'broker': self.broker,
-            'starting_balance': self.starting_balance,
-            'current_balance': self.current_balance,
-            'currency': self.currency,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return model_serializer(TradingAccount)(self)
 
 class TradingStrategy(Base):
     """Trading strategy model"""
@@ -193,17 +140,7 @@ class TradingStrategy(Base):
     trades = relationship("Trade", back_populates="strategy")
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'rules': self.rules,
-            'win_rate_target': self.win_rate_target,
-            'risk_reward_target': self.risk_reward_target,
-            'max_daily_trades': self.max_daily_trades,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return model_serializer(TradingStrategy)(self)
 
 class TradeTag(Base):
     """Trade tags for categorization"""
@@ -216,13 +153,7 @@ class TradeTag(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'color': self.color,
-            'description': self.description,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return model_serializer(TradeTag)(self)
 
 class TradeImage(Base):
     """Trade screenshots/charts"""
@@ -239,11 +170,64 @@ class TradeImage(Base):
     trade = relationship("Trade", back_populates="images")
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'trade_id': self.trade_id,
-            'image_url': self.image_url,
-            'image_type': self.image_type,
-            'description': self.description,
-            'uploaded_at': self.uploaded_at.isoformat() if self.uploaded_at else None
-        }
\ No newline at end of file
+        return model_serializer(TradeImage)(self)
+
+# account_id of aggregate rows for trades without an account (and of the
+# global row): unique indexes treat NULLs as distinct, so NULL cannot be used
+NO_ACCOUNT = 0
+
+
+class AccountStats(Base):
+    """Incrementally maintained trade totals per account (is_global row = all accounts)"""
+    __tablename__ = 'account_stats'
+    
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, default=NO_ACCOUNT, nullable=False)
+    is_global = Column(Boolean, default=False, nullable=False)
+    
+    closed_trades = Column(Integer, default=0, nullable=False)
+    open_trades = Column(Integer, default=0, nullable=False)
+    winning_trades = Column(Integer, default=0, nullable=False)
+    total_pnl = Column(Float, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('uq_account_stats_scope', 'is_global', 'account_id', unique=True),
+    )
+    
+    def to_dict(self):
+        return model_serializer(AccountStats, exclude=('id',))(self)
+
+
+class DailyPnl(Base):
+    """Closed-trade P&L rolled up per account and close date"""
+    __tablename__ = 'daily_pnl'
+    
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, default=NO_ACCOUNT, nullable=False)
+    date = Column(Date, nullable=False)
+    
+    pnl = Column(Float, default=0, nullable=False)
+    trade_count = Column(Integer, default=0, nullable=False)
+    wins = Column(Integer, default=0, nullable=False)
+    losses = Column(Integer, default=0, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_daily_pnl_date_account', 'date', 'account_id'),
+        Index('uq_daily_pnl_account_date', 'account_id', 'date', unique=True),
+    )
+    
+    def to_dict(self):
+        return model_serializer(DailyPnl, exclude=('id',))(self)
+
+
+class DataVersion(Base):
+    """Monotonic change counter per data scope, used for HTTP cache validators"""
+    __tablename__ = 'data_versions'
+    
+    name = Column(String(50), primary_key=True)  # e.g. "trades", "videos"
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return model_serializer(DataVersion)(self)
@@ -0,0 +1,96 @@
+"""
+MongoDB connection, index bootstrap, data versions and server-side trade updates
+
+Set MONGODB_URI=mongomock://localhost to run the Mongo backend against an
+in-process mongomock client instead of a real mongod (tests, benchmarks).
+"""
+import os
+from pymongo import MongoClient, IndexModel, ASCENDING, DESCENDING
+from dotenv import load_dotenv
+from repository import CONTRACT_SIZE, TIMEFRAME_FIELDS, UPDATABLE_FIELDS
+
+load_dotenv()
+
+MONGO_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
+MONGO_DB_NAME = os.getenv('MONGODB_DB', 'trading_dashboard')
+
+TRADE_INDEXES = [
+    # Stats pipelines $match on status and range-scan closed_at
+    IndexModel([('status', ASCENDING), ('closed_at', ASCENDING)], name='status_closed_at'),
+    IndexModel([('closed_at', ASCENDING)], name='closed_at'),
+    IndexModel([('symbol', ASCENDING)], name='symbol'),
+    IndexModel([('created_at', DESCENDING)], name='created_at_desc')
+]
+
+
+def create_client(uri=MONGO_URI):
+    """MongoClient with connection pool settings from the environment"""
+    if uri.startswith('mongomock://'):
+        import mongomock
+        return mongomock.MongoClient()
+
+    return MongoClient(
+        uri,
+        maxPoolSize=int(os.getenv('MONGO_MAX_POOL_SIZE', '100')),
+        minPoolSize=int(os.getenv('MONGO_MIN_POOL_SIZE', '0')),
+        maxIdleTimeMS=int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '60000')),
+        waitQueueTimeoutMS=int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', '10000')),
+        serverSelectionTimeoutMS=int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+    )
+
+
+def ensure_indexes(collection):
+    """Create the trade indexes if missing (idempotent)"""
+    return collection.create_indexes(TRADE_INDEXES)
+
+
+def get_data_version(versions, scope):
+    """Current version for a scope (0 if it has never been written)"""
+    document = versions.find_one({'_id': scope}, {'version': 1})
+    return document['version'] if document else 0
+
+
+def bump_data_version(versions, scope):
+    """Increment a scope's version after a write (Mongo counterpart of etags.py)"""
+    versions.update_one({'_id': scope}, {'$inc': {'version': 1}}, upsert=True)
+
+
+def _round(expression, places):
+    # floor(x * 10^n + 0.5) / 10^n rather than $round, which mongomock lacks
+    scale = 10 ** places
+    return {'$divide': [{'$floor': {'$add': [{'$multiply': [expression, scale]}, 0.5]}}, scale]}
+
+
+def _pnl_expression():
+    sign = {'$cond': [{'$eq': ['$direction', 'LONG']}, 1, -1]}
+    return _round({'$multiply': [
+        {'$subtract': ['$exit_price', '$entry_price']},
+        sign, '$lot_size', CONTRACT_SIZE
+    ]}, 2)
+
+
+def trade_update_pipeline(data, now):
+    """Pipeline update applying request data and recomputing derived fields
+
+    Stages run in order, so confluence and P&L see the new field values.
+    Mirrors repository.derived_fields(): a trade with an exit price is
+    closed and keeps its first closed_at; one without is open with no P&L.
+    """
+    changes = {field: {'$literal': data[field]} for field in UPDATABLE_FIELDS if field in data}
+
+    pipeline = []
+    if changes:
+        pipeline.append({'$set': changes})
+
+    pipeline.append({'$set': {'total_confluence': _round(
+        {'$divide': [{'$add': [{'$ifNull': [f'${field}', 0]} for field in TIMEFRAME_FIELDS]}, 5]}, 1
+    )}})
+
+    # null and missing compare below any number, so this is "has an exit price"
+    closed = {'$gt': ['$exit_price', 0]}
+    pipeline.append({'$set': {
+        'pnl': {'$cond': [closed, _pnl_expression(), 0]},
+        'status': {'$cond': [closed, 'CLOSED', 'OPEN']},
+        'closed_at': {'$cond': [closed, {'$ifNull': ['$closed_at', {'$literal': now}]}, None]}
+    }})
+    return pipeline
@@ -0,0 +1,143 @@
+"""
+MongoDB trade repository
+
+Statistics run as aggregation pipelines (mongo_stats.py) and updates as a
+single find_one_and_update with a pipeline update (mongo_database.py).
+Every write bumps the trades version in the data_versions collection, so
+stats caches in other workers notice it.
+"""
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from mongo_database import (create_client, ensure_indexes, trade_update_pipeline,
+                            get_data_version, bump_data_version, MONGO_DB_NAME)
+from mongo_stats import build_account_stats, build_metrics, build_daily_series, build_monthly_stats
+from exporter import EXPORT_CHUNK_ROWS
+from repository import (TradeRepository, WriteRejected, new_trade_fields, EXPORT_FIELDS,
+                        SNAPSHOT_PAGE_SIZE)
+
+
+NEWEST_FIRST = [('created_at', -1), ('_id', -1)]
+
+
+def _scope(account_id=None, **conditions):
+    if account_id is not None:
+        conditions['account_id'] = account_id
+    return conditions
+
+
+def _object_id(trade_id):
+    return ObjectId(trade_id) if ObjectId.is_valid(trade_id) else None
+
+
+def serialize_trade(trade):
+    """Expose the ObjectId as a string under both _id and id"""
+    if trade:
+        trade['_id'] = trade['id'] = str(trade['_id'])
+    return trade
+
+
+class MongoTradeRepository(TradeRepository):
+    """Trades in the MongoDB collection configured by mongo_database.py"""
+
+    name = 'mongo'
+
+    def __init__(self, collection=None):
+        if collection is None:
+            collection = create_client()[MONGO_DB_NAME]['trades']
+        self.collection = collection
+        self.versions = collection.database['data_versions']
+        ensure_indexes(collection)
+
+    def data_version(self):
+        return get_data_version(self.versions, 'trades')
+
+    # Trades
+
+    def list_trades(self, args):
+        trades = self.collection.find().sort(NEWEST_FIRST)
+        return [serialize_trade(t) for t in trades], None
+
+    def get_trade(self, trade_id):
+        return serialize_trade(self.collection.find_one({'_id': _object_id(trade_id)}))
+
+    def create_trade(self, data):
+        trade = new_trade_fields(data, datetime.utcnow())
+        trade['_id'] = self.collection.insert_one(trade).inserted_id
+        bump_data_version(self.versions, 'trades')
+        return serialize_trade(trade)
+
+    def update_trade(self, trade_id, data):
+        # One round trip: confluence, P&L and status are recomputed server-side
+        trade = self.collection.find_one_and_update(
+            {'_id': _object_id(trade_id)},
+            trade_update_pipeline(data, datetime.utcnow()),
+            return_document=ReturnDocument.AFTER
+        )
+        if trade:
+            bump_data_version(self.versions, 'trades')
+        return serialize_trade(trade)
+
+    def delete_trade(self, trade_id):
+        if not self.collection.delete_one({'_id': _object_id(trade_id)}).deleted_count:
+            return False
+        bump_data_version(self.versions, 'trades')
+        return True
+
+    def insert_trades(self, trades):
+        try:
+            self.collection.insert_many(trades, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            message = errors[0]['errmsg'] if errors else str(e)
+            raise WriteRejected(message, [error['index'] for error in errors]) from e
+        finally:
+            bump_data_version(self.versions, 'trades')  # Unordered: some may be stored on error
+
+    def export_trades(self, start=None, end=None, account_id=None):
+        query = _scope(account_id)
+        if start is not None:
+            query.setdefault('created_at', {})['$gte'] = start
+        if end is not None:
+            query.setdefault('created_at', {})['$lt'] = end
+        trades = self.collection.find(query).sort([('created_at', 1), ('_id', 1)])
+        rows = (
+            tuple(trade.get(field) for field in EXPORT_FIELDS)
+            for trade in map(serialize_trade, trades.batch_size(EXPORT_CHUNK_ROWS))
+        )
+        return EXPORT_FIELDS, rows
+
+    # Statistics
+
+    def account_stats(self, account_id=None):
+        return build_account_stats(self.collection, account_id)
+
+    def metrics(self, account_id=None):
+        return build_metrics(self.collection, account_id)
+
+    def daily_series(self, account_id=None):
+        return build_daily_series(self.collection, account_id)
+
+    def monthly_stats(self, year, month, account_id=None):
+        return build_monthly_stats(self.collection, year, month, account_id)
+
+    def closed_trade_rows(self, account_id=None):
+        trades = self.collection.find(
+            _scope(account_id, status='CLOSED', closed_at={'$ne': None}),
+            {'_id': 0, 'pnl': 1, 'closed_at': 1, 'entry_price': 1, 'stop_loss': 1, 'lot_size': 1}
+        ).sort([('closed_at', 1), ('_id', 1)])
+        return [
+            (t.get('pnl'), t['closed_at'], t['entry_price'], t.get('stop_loss'), t['lot_size'])
+            for t in trades
+        ]
+
+    # Dashboard
+
+    def recent_trades(self, account_id=None, limit=SNAPSHOT_PAGE_SIZE):
+        trades = self.collection.find(_scope(account_id)).sort(NEWEST_FIRST).limit(limit)
+        return [serialize_trade(t) for t in trades]
+
+    def open_trades(self, account_id=None):
+        trades = self.collection.find(_scope(account_id, status='OPEN')).sort(NEWEST_FIRST)
+        return [serialize_trade(t) for t in trades]
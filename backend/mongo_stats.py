@@ -0,0 +1,145 @@
+"""
+Statistics for the MongoDB backend as server-side aggregation pipelines
+
+Every builder runs a single aggregate() and only the grouped result
+crosses the wire; response shapes match the SQL builders in stats.py.
+"""
+from datetime import datetime, time
+from repository import account_summary, metrics_summary, month_bounds
+
+IS_CLOSED = {'$eq': ['$status', 'CLOSED']}
+IS_WIN = {'$gt': ['$pnl', 0]}
+IS_LOSS = {'$lt': ['$pnl', 0]}
+
+
+def _count_if(condition):
+    return {'$sum': {'$cond': [condition, 1, 0]}}
+
+
+def _match(account_id=None, **conditions):
+    if account_id is not None:
+        conditions['account_id'] = account_id
+    return {'$match': conditions}
+
+
+def _closed_days_stages(account_id=None, **conditions):
+    """Closed trades grouped into one {_id: 'YYYY-MM-DD', pnl, trades} per day"""
+    return [
+        _match(account_id, status='CLOSED', closed_at={'$ne': None, **conditions}),
+        {'$project': {
+            '_id': 0,
+            'pnl': {'$ifNull': ['$pnl', 0]},
+            'day': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$closed_at'}}
+        }},
+        {'$group': {'_id': '$day', 'pnl': {'$sum': '$pnl'}, 'trades': {'$sum': 1}}},
+        {'$sort': {'_id': 1}}
+    ]
+
+
+def build_account_stats(collection, account_id=None):
+    """Account summary from one $group over all trades"""
+    result = next(collection.aggregate([
+        _match(account_id),
+        {'$project': {'_id': 0, 'status': 1, 'pnl': {'$ifNull': ['$pnl', 0]}}},
+        {'$group': {
+            '_id': None,
+            'closed_trades': _count_if(IS_CLOSED),
+            'open_trades': _count_if({'$eq': ['$status', 'OPEN']}),
+            'winning_trades': _count_if({'$and': [IS_CLOSED, IS_WIN]}),
+            'total_pnl': {'$sum': {'$cond': [IS_CLOSED, '$pnl', 0]}}
+        }}
+    ]), {})
+
+    return account_summary(result.get('total_pnl', 0), result.get('closed_trades', 0),
+                           result.get('open_trades', 0), result.get('winning_trades', 0))
+
+
+def build_metrics(collection, account_id=None):
+    """Performance metrics from one $group over closed trades"""
+    result = next(collection.aggregate([
+        _match(account_id, status='CLOSED'),
+        {'$project': {
+            '_id': 0,
+            'pnl': {'$ifNull': ['$pnl', 0]},
+            'total_confluence': {'$ifNull': ['$total_confluence', 0]}
+        }},
+        {'$group': {
+            '_id': None,
+            'closed_count': {'$sum': 1},
+            'win_count': _count_if(IS_WIN),
+            'loss_count': _count_if(IS_LOSS),
+            'gross_profit': {'$sum': {'$cond': [IS_WIN, '$pnl', 0]}},
+            'gross_loss': {'$sum': {'$cond': [IS_LOSS, '$pnl', 0]}},
+            # $max/$min skip nulls, so non-matching trades drop out
+            'largest_win': {'$max': {'$cond': [IS_WIN, '$pnl', None]}},
+            'largest_loss': {'$min': {'$cond': [IS_LOSS, '$pnl', None]}},
+            'average_confluence': {'$avg': '$total_confluence'}
+        }}
+    ]), None)
+
+    if not result:
+        return metrics_summary(0, 0, 0, 0, 0, 0, 0, 0)
+    return metrics_summary(
+        result['closed_count'], result['win_count'], result['loss_count'],
+        result['gross_profit'], result['gross_loss'],
+        result['largest_win'], result['largest_loss'], result['average_confluence']
+    )
+
+
+def build_daily_series(collection, account_id=None):
+    """Closed-trade P&L per day"""
+    return [
+        {'date': day['_id'], 'pnl': round(day['pnl'], 2)}
+        for day in collection.aggregate(_closed_days_stages(account_id))
+    ]
+
+
+def build_monthly_stats(collection, year, month, account_id=None):
+    """Calendar month summary and per-day breakdown
+
+    A $facet returns the sorted day rows and the month totals from one pass.
+    """
+    start, end = (datetime.combine(day, time.min) for day in month_bounds(year, month))
+
+    result = next(collection.aggregate(
+        _closed_days_stages(account_id, **{'$gte': start, '$lt': end}) + [
+            {'$facet': {
+                'days': [{'$sort': {'_id': 1}}],  # Sub-pipelines may not be empty
+                'summary': [{'$group': {
+                    '_id': None,
+                    'total_pnl': {'$sum': '$pnl'},
+                    'total_trades': {'$sum': '$trades'},
+                    'trading_days': {'$sum': 1},
+                    'winning_days': _count_if({'$gt': ['$pnl', 0]}),
+                    'losing_days': _count_if({'$lt': ['$pnl', 0]})
+                }}],
+                'best': [{'$sort': {'pnl': -1, '_id': 1}}, {'$limit': 1}],
+                'worst': [{'$sort': {'pnl': 1, '_id': 1}}, {'$limit': 1}]
+            }}
+        ]
+    ))
+
+    summary = result['summary'][0] if result['summary'] else {}
+    total_pnl = summary.get('total_pnl', 0)
+    total_days = summary.get('trading_days', 0)
+    winning_days = summary.get('winning_days', 0)
+    best_day = result['best'][0] if result['best'] else {'_id': None, 'pnl': 0}
+    worst_day = result['worst'][0] if result['worst'] else {'_id': None, 'pnl': 0}
+
+    return {
+        'year': year,
+        'month': month,
+        'total_pnl': round(total_pnl, 2),
+        'total_trades': summary.get('total_trades', 0),
+        'trading_days': total_days,
+        'winning_days': winning_days,
+        'losing_days': summary.get('losing_days', 0),
+        'win_rate': round((winning_days / total_days * 100) if total_days > 0 else 0, 1),
+        'best_day': {'date': best_day['_id'], 'pnl': round(best_day['pnl'], 2)},
+        'worst_day': {'date': worst_day['_id'], 'pnl': round(worst_day['pnl'], 2)},
+        'average_daily_pnl': round(total_pnl / total_days, 2) if total_days > 0 else 0,
+        'daily_data': [
+            {'date': day['_id'], 'pnl': round(day['pnl'], 2), 'trades': day['trades']}
+            for day in result['days']
+        ]
+    }
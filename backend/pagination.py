@@ -0,0 +1,100 @@
+"""
+Keyset pagination and column projection for list endpoints
+"""
+import base64
+from datetime import datetime
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import selectinload
+from models import Trade
+from repository import InvalidQuery, parse_limit, DEFAULT_PAGE_SIZE
+
+
+def encode_cursor(created_at, row_id):
+    """Opaque cursor pointing just past (created_at, id)"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor(); returns (created_at, id)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidQuery('Invalid cursor')
+
+
+def parse_fields(model, value):
+    """Map a comma-separated fields parameter onto model column names"""
+    if not value:
+        return None
+    columns = model.__table__.columns
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in columns]
+    if unknown:
+        raise InvalidQuery(f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(fields))
+
+
+def keyset_page(query, model, cursor=None, limit=None):
+    """Order newest first on (created_at, id) and apply the cursor/limit
+
+    Fetches one extra row to detect whether another page exists. Returns
+    (rows, has_more).
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < row_id)
+        ))
+
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if limit is None:
+        return query.all(), False
+
+    rows = query.limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+
+def serialize_columns(row, fields):
+    """Serialize a projected row (named tuple) to a dict of the requested fields"""
+    result = {}
+    for name in fields:
+        value = getattr(row, name)
+        result[name] = value.isoformat() if isinstance(value, datetime) else value
+    return result
+
+
+def list_trades(db, args):
+    """Trade list for GET /api/trades-style query params
+
+    args is any mapping with .get() (Flask request.args, Starlette
+    query_params). Returns (items, next_cursor); raises InvalidQuery.
+    """
+    cursor = args.get('cursor')
+    include_images = 'images' in args.get('include', 'images').split(',')
+    limit = parse_limit(args.get('limit'))
+    fields = parse_fields(Trade, args.get('fields'))
+    if cursor and limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    
+    if fields:
+        # Select only the requested columns (plus the keyset columns)
+        columns = dict.fromkeys(fields + ['created_at', 'id'])
+        query = db.query(*[getattr(Trade, name) for name in columns])
+    elif include_images:
+        # Load images for the whole page in one IN query instead of one per trade
+        query = db.query(Trade).options(selectinload(Trade.images))
+    else:
+        query = db.query(Trade)
+    trades, has_more = keyset_page(query, Trade, cursor, limit)
+    
+    if fields:
+        items = [serialize_columns(trade, fields) for trade in trades]
+    else:
+        items = [trade.to_dict(include_images) for trade in trades]
+    
+    next_cursor = encode_cursor(trades[-1].created_at, trades[-1].id) if has_more else None
+    return items, next_cursor
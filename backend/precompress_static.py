@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Write .br and .gz siblings for the frontend's text assets (build step)
+
+compression.send_static() serves these instead of compressing per
+request. Siblings are only kept when they are meaningfully smaller; .br
+files need the brotli package and are skipped without it.
+
+    python backend/precompress_static.py [frontend_dir]
+"""
+import gzip
+import os
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FRONTEND_DIR = Path(__file__).parent.parent / 'frontend'
+SUFFIXES = {'.html', '.css', '.js', '.mjs', '.json', '.svg', '.txt', '.map'}
+MIN_SIZE = 1024
+MIN_SAVING = 0.1  # Keep a sibling only if it saves at least 10%
+
+
+def _compressors():
+    compressors = [('.gz', lambda data: gzip.compress(data, 9, mtime=0))]
+    if brotli:
+        compressors.insert(0, ('.br', lambda data: brotli.compress(data, quality=11)))
+    return compressors
+
+
+def precompress(directory=FRONTEND_DIR):
+    """Compress eligible files in place; returns {path: {suffix: bytes}}"""
+    report = {}
+    compressors = _compressors()
+    for path in sorted(Path(directory).rglob('*')):
+        if not path.is_file() or path.suffix not in SUFFIXES:
+            continue
+        data = path.read_bytes()
+        for suffix, compress in compressors:
+            sibling = path.with_name(path.name + suffix)
+            compressed = compress(data) if len(data) >= MIN_SIZE else None
+            if compressed is None or len(compressed) > len(data) * (1 - MIN_SAVING):
+                sibling.unlink(missing_ok=True)
+                continue
+            tmp = sibling.with_name(sibling.name + '.tmp')
+            tmp.write_bytes(compressed)
+            os.replace(tmp, sibling)
+            report.setdefault(str(path.relative_to(directory)), {'original': len(data)})[suffix] = len(compressed)
+    return report
+
+
+def main():
+    directory = Path(sys.argv[1]) if len(sys.argv) > 1 else FRONTEND_DIR
+    report = precompress(directory)
+    for name, sizes in report.items():
+        variants = ', '.join(f'{suffix} {size}' for suffix, size in sizes.items() if suffix != 'original')
+        print(f"{name}: {sizes['original']} -> {variants}")
+    if not brotli:
+        print('brotli not installed: wrote .gz siblings only')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Opt-in sampling profiler for slow endpoints
+
+A sampled fraction of requests is profiled by a background thread that
+reads the request thread's stack every PROFILE_INTERVAL_MS; requests that
+are not sampled pay only for a random() call. Each profiled request is
+written to PROFILE_DIR/<endpoint>/ in collapsed-stack format ("a;b;c N"),
+ready for flamegraph.pl or speedscope, keeping the newest PROFILE_KEEP
+files per endpoint.
+
+Enable with PROFILE_ENABLED=true or POST /api/admin/profiling. Settings
+are per process, so a single gunicorn worker can be profiled on its own.
+"""
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from flask import request, g
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def parse_route_rates(value):
+    """'get_monthly_stats=0.5,/api/videos=0.1' -> {route: rate}"""
+    rates = {}
+    for item in (value or '').split(','):
+        if not item.strip():
+            continue
+        route, _, rate = item.rpartition('=')
+        if not route:
+            raise ValueError(f"Expected route=rate, got '{item.strip()}'")
+        rates[route.strip()] = parse_rate(rate)
+    return rates
+
+
+def parse_rate(value):
+    """A sample rate between 0 and 1"""
+    rate = float(value)
+    if not 0 <= rate <= 1:
+        raise ValueError('Sample rates must be between 0 and 1')
+    return rate
+
+
+settings = {
+    'enabled': os.getenv('PROFILE_ENABLED', 'false').lower() == 'true',
+    # Fraction of requests profiled on routes without their own rate
+    'sample_rate': parse_rate(os.getenv('PROFILE_SAMPLE_RATE', '0.01')),
+    # Per-route rates keyed by endpoint name or URL rule
+    'routes': parse_route_rates(os.getenv('PROFILE_ROUTES')),
+    'directory': os.getenv('PROFILE_DIR', str(Path(__file__).parent / 'profiles')),
+    'keep': int(os.getenv('PROFILE_KEEP', '50')),
+    'interval_ms': float(os.getenv('PROFILE_INTERVAL_MS', '5')),
+}
+
+
+def _frame_name(code):
+    return f"{Path(code.co_filename).stem}:{code.co_qualname}"
+
+
+def collapse_stack(frame):
+    """Root-first 'module:function;...' for a frame and its callers"""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    """Samples the stacks of registered threads on a shared daemon thread"""
+
+    def __init__(self):
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self, ident):
+        with self._lock:
+            self._active[ident] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+            self._wake.set()
+
+    def stop(self, ident):
+        """Stop sampling a thread and return its {stack: samples} counts"""
+        with self._lock:
+            return self._active.pop(ident, Counter())
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                idents = list(self._active)
+                if not idents:
+                    self._wake.clear()
+                    continue
+
+            frames = sys._current_frames()
+            stacks = {ident: collapse_stack(frames[ident]) for ident in idents if ident in frames}
+            with self._lock:
+                for ident, stack in stacks.items():
+                    if ident in self._active:
+                        self._active[ident][stack] += 1
+            time.sleep(settings['interval_ms'] / 1000)
+
+
+sampler = StackSampler()
+
+
+def sample_rate_for(endpoint, rule):
+    rates = settings['routes']
+    if endpoint in rates:
+        return rates[endpoint]
+    if rule in rates:
+        return rates[rule]
+    return settings['sample_rate']
+
+
+def write_profile(endpoint, samples, elapsed):
+    """Write one request's collapsed stacks and prune old files for the endpoint"""
+    directory = Path(settings['directory']) / endpoint
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S.%f')
+    path = directory / f'{stamp}-{os.getpid()}-{elapsed * 1000:.0f}ms.collapsed'
+    path.write_text(''.join(f'{stack} {count}\n' for stack, count in samples.most_common()))
+
+    profiles = sorted(directory.glob('*.collapsed'))
+    for old in profiles[:max(0, len(profiles) - settings['keep'])]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def list_profiles():
+    """{endpoint: [file names, newest first]} under the profile directory"""
+    root = Path(settings['directory'])
+    if not root.is_dir():
+        return {}
+    return {
+        directory.name: sorted((path.name for path in directory.glob('*.collapsed')), reverse=True)
+        for directory in sorted(root.iterdir()) if directory.is_dir()
+    }
+
+
+def register_profiler(app):
+    """Install hooks that profile a sampled fraction of requests"""
+
+    @app.before_request
+    def start_profiling():
+        if not settings['enabled'] or request.endpoint is None:
+            return None
+        rule = request.url_rule.rule if request.url_rule else None
+        if random.random() >= sample_rate_for(request.endpoint, rule):
+            return None
+        g.profile_thread = threading.get_ident()
+        g.profile_started = time.perf_counter()
+        sampler.start(g.profile_thread)
+        return None
+
+    # Teardown runs after a streamed body is sent, so it is profiled too
+    @app.teardown_request
+    def finish_profiling(exc):
+        ident = g.pop('profile_thread', None)
+        if ident is None:
+            return
+        samples = sampler.stop(ident)
+        if samples:
+            elapsed = time.perf_counter() - g.pop('profile_started')
+            try:
+                write_profile(request.endpoint, samples, elapsed)
+            except OSError as e:
+                app.logger.warning('Could not write profile: %s', e)
+
+    return app
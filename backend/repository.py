@@ -0,0 +1,332 @@
+"""
+Storage-agnostic trade repository interface and shared trade logic
+
+The trade API routes (trade_api.py) talk only to a TradeRepository; the
+backend is chosen with TRADE_BACKEND=sql|json|mongo. Backend modules are
+imported lazily so the JSON backend runs without SQLAlchemy or pymongo.
+"""
+import os
+from datetime import date
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TRADE_BACKEND = os.getenv('TRADE_BACKEND', 'sql').lower()
+BACKENDS = ('sql', 'json', 'mongo')
+
+CONTRACT_SIZE = 100000
+STARTING_BALANCE = 100000
+TIMEFRAME_FIELDS = ('weekly_tf', 'daily_tf', 'h4_tf', 'h1_tf', 'lower_tf')
+UPDATABLE_FIELDS = ('symbol', 'direction', 'entry_price', 'exit_price', 'lot_size',
+                    *TIMEFRAME_FIELDS, 'risk_reward', 'notes')
+
+# Export columns for backends without a fixed schema (the SQL backend
+# exports every trades table column)
+EXPORT_FIELDS = ('id', 'account_id', 'symbol', 'direction', 'entry_price', 'exit_price',
+                 'lot_size', 'status', 'stop_loss', *TIMEFRAME_FIELDS, 'total_confluence',
+                 'risk_reward', 'pnl', 'notes', 'created_at', 'closed_at')
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+SNAPSHOT_PAGE_SIZE = 50
+
+
+class InvalidQuery(ValueError):
+    """Raised for malformed limit/cursor/fields parameters"""
+
+
+class WriteRejected(Exception):
+    """The store refused a batch write (e.g. a foreign key violation)
+
+    failed lists the indexes of the batch rows that were not stored; None
+    means none of them were.
+    """
+
+    def __init__(self, message, failed=None):
+        super().__init__(message)
+        self.failed = failed
+
+
+def parse_limit(value):
+    """Validate the limit parameter; None means unpaginated"""
+    if value is None:
+        return None
+    try:
+        limit = int(value)
+    except ValueError:
+        raise InvalidQuery('limit must be an integer')
+    if limit < 1:
+        raise InvalidQuery('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def calculate_confluence(weekly, daily, h4, h1, lower):
+    """Calculate total confluence from individual timeframes"""
+    return round((weekly + daily + h4 + h1 + lower) / 5, 1)
+
+
+def calculate_pnl(direction, entry_price, exit_price, lot_size):
+    """Calculate P&L for a trade (0 while it is still open)"""
+    if not exit_price:
+        return 0
+
+    if direction == 'LONG':
+        pnl = (exit_price - entry_price) * lot_size * CONTRACT_SIZE
+    else:  # SHORT
+        pnl = (entry_price - exit_price) * lot_size * CONTRACT_SIZE
+
+    return round(pnl, 2)
+
+
+def derived_fields(trade, now):
+    """Confluence, status, P&L and closed_at for a mapping of trade fields
+
+    A trade is closed once it has an exit price; closed_at keeps its first
+    value across later edits.
+    """
+    closed = bool(trade.get('exit_price'))
+    return {
+        'total_confluence': calculate_confluence(*(trade.get(f) or 0 for f in TIMEFRAME_FIELDS)),
+        'status': 'CLOSED' if closed else 'OPEN',
+        'pnl': calculate_pnl(trade['direction'], trade['entry_price'],
+                             trade.get('exit_price'), trade['lot_size']),
+        'closed_at': (trade.get('closed_at') or now) if closed else None
+    }
+
+
+def new_trade_fields(data, now):
+    """Field values for a trade created from request data"""
+    fields = {
+        'symbol': data['symbol'],
+        'direction': data['direction'],
+        'entry_price': data['entry_price'],
+        'exit_price': data.get('exit_price'),
+        'lot_size': data['lot_size'],
+        'risk_reward': data.get('risk_reward'),
+        'notes': data.get('notes'),
+        'created_at': now
+    }
+    for field in TIMEFRAME_FIELDS:
+        fields[field] = data.get(field, 0)
+    fields.update(derived_fields(fields, now))
+    return fields
+
+
+def updated_trade_fields(current, data, now):
+    """Field values after applying request data to a trade's current values"""
+    fields = dict(current)
+    fields.update({field: data[field] for field in UPDATABLE_FIELDS if field in data})
+    fields.update(derived_fields(fields, now))
+    return fields
+
+
+def account_summary(total_pnl, closed_trades, open_trades, winning_trades):
+    """Account stats response from raw counts"""
+    return {
+        'starting_balance': STARTING_BALANCE,
+        'current_balance': STARTING_BALANCE + total_pnl,
+        'total_pnl': total_pnl,
+        'pnl_percentage': total_pnl / STARTING_BALANCE * 100,
+        'total_trades': closed_trades,
+        'open_trades': open_trades,
+        'winning_trades': winning_trades,
+        'losing_trades': closed_trades - winning_trades
+    }
+
+
+def metrics_summary(closed_count, win_count, loss_count, gross_profit, gross_loss,
+                    largest_win, largest_loss, average_confluence):
+    """Performance metrics response from closed-trade aggregates"""
+    if not closed_count:
+        return {
+            'profit_factor': 0,
+            'win_rate': 0,
+            'average_win': 0,
+            'average_loss': 0,
+            'largest_win': 0,
+            'largest_loss': 0,
+            'average_confluence': 0
+        }
+
+    gross_loss = abs(gross_loss)
+    return {
+        'profit_factor': round(gross_profit / gross_loss, 2) if gross_loss > 0 else 0,
+        'win_rate': round(win_count / closed_count * 100, 1),
+        'average_win': round(gross_profit / win_count, 2) if win_count else 0,
+        'average_loss': round(gross_loss / loss_count, 2) if loss_count else 0,
+        'largest_win': round(largest_win or 0, 2),
+        'largest_loss': round(largest_loss or 0, 2),
+        'average_confluence': round(average_confluence or 0, 1)
+    }
+
+
+def monthly_summary(year, month, days):
+    """Monthly stats response from (date_str, pnl, trades) rows in date order"""
+    pnls = [pnl for _, pnl, _ in days]
+    total_pnl = sum(pnls)
+    total_days = len(days)
+    winning_days = len([pnl for pnl in pnls if pnl > 0])
+
+    best_day = max(days, key=lambda day: day[1]) if days else (None, 0, 0)
+    worst_day = min(days, key=lambda day: day[1]) if days else (None, 0, 0)
+
+    return {
+        'year': year,
+        'month': month,
+        'total_pnl': round(total_pnl, 2),
+        'total_trades': sum(trades for _, _, trades in days),
+        'trading_days': total_days,
+        'winning_days': winning_days,
+        'losing_days': len([pnl for pnl in pnls if pnl < 0]),
+        'win_rate': round((winning_days / total_days * 100) if total_days > 0 else 0, 1),
+        'best_day': {'date': best_day[0], 'pnl': round(best_day[1], 2)},
+        'worst_day': {'date': worst_day[0], 'pnl': round(worst_day[1], 2)},
+        'average_daily_pnl': round(total_pnl / total_days, 2) if total_days > 0 else 0,
+        'daily_data': [
+            {'date': day, 'pnl': round(pnl, 2), 'trades': trades}
+            for day, pnl, trades in days
+        ]
+    }
+
+
+def month_bounds(year, month):
+    """First day of the month and first day of the next month"""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+class TradeRepository:
+    """Storage backend for trades and trade statistics
+
+    Trades are plain dicts as returned by the API. Trade ids are passed
+    through from the URL as strings; lookups with an id the backend cannot
+    parse behave like a missing trade.
+    """
+
+    name = None
+
+    def init_app(self, app):
+        """Hook for per-app setup (sessions, teardown); optional"""
+
+    def data_version(self):
+        """Token that grows with every committed trade write, or None
+
+        Shared by all worker processes; lets caches of derived data notice
+        writes made elsewhere.
+        """
+        return None
+
+    # Trades
+
+    def list_trades(self, args):
+        """Trades newest first as (items, next_cursor)
+
+        args are the request query params; backends honour the paging and
+        projection params they support and raise ValueError for bad ones.
+        """
+        raise NotImplementedError
+
+    def get_trade(self, trade_id):
+        raise NotImplementedError
+
+    def create_trade(self, data):
+        raise NotImplementedError
+
+    def update_trade(self, trade_id, data):
+        """Apply request data to a trade; None if it does not exist"""
+        raise NotImplementedError
+
+    def close_trade(self, trade_id, exit_price):
+        return self.update_trade(trade_id, {'exit_price': exit_price})
+
+    def delete_trade(self, trade_id):
+        """Delete a trade; False if it does not exist"""
+        raise NotImplementedError
+
+    def insert_trades(self, trades):
+        """Store a batch of new trades (bulk import) in one write
+
+        trades are dicts of validated field values with datetimes, already
+        carrying their derived fields. Raises WriteRejected if the store
+        refuses the batch, after undoing any partial write it can.
+        """
+        raise NotImplementedError
+
+    def export_trades(self, start=None, end=None, account_id=None):
+        """(columns, rows) for the export, oldest first
+
+        rows is a lazy iterable of tuples in column order; start and end
+        (datetimes, end exclusive) filter on created_at.
+        """
+        raise NotImplementedError
+
+    # Statistics
+
+    def account_stats(self, account_id=None):
+        raise NotImplementedError
+
+    def metrics(self, account_id=None):
+        raise NotImplementedError
+
+    def daily_series(self, account_id=None):
+        raise NotImplementedError
+
+    def monthly_stats(self, year, month, account_id=None):
+        raise NotImplementedError
+
+    def closed_trade_rows(self, account_id=None):
+        """(pnl, closed_at, entry_price, stop_loss, lot_size) per closed trade
+
+        In close time order, closed_at as a datetime.
+        """
+        raise NotImplementedError
+
+    def advanced_stats(self, account_id=None):
+        """Equity curve, drawdown, risk ratios and R-multiples (needs numpy)"""
+        from analytics import closed_trade_arrays, compute_advanced_metrics
+        return compute_advanced_metrics(closed_trade_arrays(self.closed_trade_rows(account_id)))
+
+    # Dashboard
+
+    def recent_trades(self, account_id=None, limit=SNAPSHOT_PAGE_SIZE):
+        """Newest trades first, at most limit"""
+        raise NotImplementedError
+
+    def open_trades(self, account_id=None):
+        """Open trades without nested images"""
+        raise NotImplementedError
+
+    def dashboard_snapshot(self, account_id=None, limit=None, cursor=None):
+        """Everything the dashboard needs in one response
+
+        account_id scopes every part; limit caps the recent-trades list.
+        Only the SQL backend pages it with cursor; raises InvalidQuery for
+        malformed or unsupported params.
+        """
+        if cursor:
+            raise InvalidQuery(f'cursor is not supported by the {self.name} trade backend')
+        return {
+            'account': self.account_stats(account_id),
+            'metrics': self.metrics(account_id),
+            'daily': self.daily_series(account_id),
+            'trades': self.recent_trades(account_id, parse_limit(limit) or SNAPSHOT_PAGE_SIZE),
+            'next_cursor': None,
+            'open_trades': self.open_trades(account_id)
+        }
+
+
+def create_repository(backend=TRADE_BACKEND):
+    """Instantiate the repository for a backend name"""
+    if backend == 'sql':
+        from sql_repository import SqlTradeRepository
+        return SqlTradeRepository()
+    if backend == 'json':
+        from json_repository import JsonTradeRepository
+        default_path = Path(__file__).parent / 'trades_data.json'
+        return JsonTradeRepository(os.getenv('DATA_FILE', default_path))
+    if backend == 'mongo':
+        from mongo_repository import MongoTradeRepository
+        return MongoTradeRepository()
+    raise ValueError(f"Unknown TRADE_BACKEND '{backend}' (expected one of {', '.join(BACKENDS)})")
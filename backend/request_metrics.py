@@ -0,0 +1,180 @@
+"""
+Per-request timing and SQL statistics as Prometheus histograms
+
+register_request_metrics() times every request per endpoint and records
+the response size; instrument_engine() counts the SQL statements and
+database time spent inside each request. Both feed process-wide
+histograms rendered by render_metrics() in the Prometheus text format,
+and each response gets a Server-Timing header for browser devtools.
+
+Histograms are per process: under gunicorn every worker keeps its own,
+like the connection pool stats.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from flask import request, g
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# [statements, seconds] for the request running in this thread/context
+_current_sql = ContextVar('current_sql', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labels, list(counts), total, count)
+                            for labels, (counts, total, count) in self._series.items())
+        for labels, counts, total, count in series:
+            label_text = ','.join(f'{name}="{_escape(value)}"'
+                                  for name, value in zip(self.label_names, labels))
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {count}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Time from request start to response headers.',
+    ('method', 'endpoint', 'status'), DURATION_BUCKETS
+)
+REQUEST_SQL_STATEMENTS = Histogram(
+    'http_request_sql_statements', 'SQL statements executed per request.',
+    ('method', 'endpoint'), STATEMENT_BUCKETS
+)
+REQUEST_SQL_DURATION = Histogram(
+    'http_request_sql_duration_seconds', 'Time spent executing SQL per request.',
+    ('method', 'endpoint'), DURATION_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Response body size.',
+    ('method', 'endpoint'), SIZE_BUCKETS
+)
+HISTOGRAMS = (REQUEST_DURATION, REQUEST_SQL_STATEMENTS, REQUEST_SQL_DURATION, RESPONSE_SIZE)
+
+
+def render_metrics():
+    """All histograms in the Prometheus text exposition format"""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return '\n'.join(lines) + '\n'
+
+
+def instrument_engine(engine):
+    """Count statements and time cursor executes against the current request"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('statement_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def end_statement(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['statement_started'].pop()
+        current = _current_sql.get()
+        if current is not None:
+            current[0] += 1
+            current[1] += elapsed
+
+    @event.listens_for(engine, 'handle_error')
+    def drop_failed_statement(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get('statement_started'):
+            connection.info['statement_started'].pop()
+
+    return engine
+
+
+def _counted(body, on_close):
+    """Pass a streamed body through, reporting its total size when done"""
+    size = 0
+    try:
+        for chunk in body:
+            size += len(chunk)
+            yield chunk
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+        on_close(size)
+
+
+def register_request_metrics(app):
+    """Install hooks that time requests and set the Server-Timing header
+
+    Register before other before_request hooks so short-circuited responses
+    (such as ETag 304s) are timed too. Streamed bodies are measured when the
+    server finishes sending them; their SQL time is what ran before the
+    headers went out.
+    """
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        _current_sql.set([0, 0.0])
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        statements, sql_seconds = _current_sql.get() or (0, 0.0)
+
+        endpoint = request.endpoint or 'unmatched'
+        labels = (request.method, endpoint)
+        REQUEST_DURATION.observe(labels + (str(response.status_code),), elapsed)
+        REQUEST_SQL_STATEMENTS.observe(labels, statements)
+        REQUEST_SQL_DURATION.observe(labels, sql_seconds)
+
+        if response.is_streamed and not response.direct_passthrough:
+            response.response = _counted(response.response,
+                                         lambda size: RESPONSE_SIZE.observe(labels, size))
+        else:
+            size = response.calculate_content_length()
+            if size is not None:
+                RESPONSE_SIZE.observe(labels, size)
+
+        response.headers['Server-Timing'] = (
+            f'app;dur={elapsed * 1000:.1f}, '
+            f'db;dur={sql_seconds * 1000:.1f};desc="{statements} queries"'
+        )
+        return response
+
+    @app.teardown_request
+    def reset_request_sql(exc):
+        _current_sql.set(None)
+
+    return app
@@ -0,0 +1,54 @@
+"""
+Column serializers generated from the SQLAlchemy mapper
+
+model_serializer(Model) compiles, once per model, a function that turns an
+instance into a dict of its columns with dates and datetimes as ISO 8601
+strings (the to_dict() format). Loaded rows are read straight from the
+instance __dict__, skipping one attribute descriptor call per column;
+expired or pending instances fall back to plain attribute access, which
+lets SQLAlchemy refresh them as usual.
+"""
+from functools import lru_cache
+from sqlalchemy import inspect, Date, DateTime, Time
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def _column_expression(source, key, temporal):
+    value = f'{source}[{key!r}]' if source == 'd' else f'{source}.{key}'
+    return f'_iso({value})' if temporal else value
+
+
+@lru_cache(maxsize=None)
+def model_serializer(model, exclude=()):
+    """obj -> {column: value} function for a mapped class, minus exclude"""
+    columns = [
+        (attr.key, isinstance(attr.columns[0].type, (Date, DateTime, Time)))
+        for attr in inspect(model).column_attrs if attr.key not in exclude
+    ]
+
+    def dict_display(source):
+        return '{' + ', '.join(
+            f'{key!r}: {_column_expression(source, key, temporal)}' for key, temporal in columns
+        ) + '}'
+
+    source = (
+        f'def by_attribute(obj):\n'
+        f'    return {dict_display("obj")}\n'
+        f'\n'
+        f'def serialize(obj):\n'
+        f'    d = obj.__dict__\n'
+        f'    try:\n'
+        f'        return {dict_display("d")}\n'
+        f'    except KeyError:\n'
+        f'        return by_attribute(obj)\n'
+    )
+    namespace = {'_iso': _iso}
+    exec(compile(source, f'<serializer {model.__name__}>', 'exec'), namespace)
+
+    serialize = namespace['serialize']
+    serialize.by_attribute = namespace['by_attribute']
+    serialize.__qualname__ = f'{model.__name__}_serializer'
+    return serialize
@@ -0,0 +1,153 @@
+"""
+SQLAlchemy trade repository
+
+Writes keep the account_stats/daily_pnl aggregates and the trades data
+version in the same transaction as the trade, reading the trade under a
+row lock so concurrent writes to it apply their deltas one after the
+other; statistics come from the builders in stats.py.
+"""
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from models import Trade, TradeImage
+from database import db_config, get_request_db, get_request_read_db
+from aggregates import (snapshot_trade, snapshot_values, apply_trade_change, apply_trade_changes,
+                        ensure_aggregates)
+from etags import bump_data_version, get_data_version
+from pagination import list_trades
+from exporter import EXPORT_CHUNK_ROWS
+from stats import (build_account_stats, build_metrics, build_daily_series, build_monthly_stats,
+                   build_advanced_stats, build_dashboard_snapshot, query_closed_trades)
+from repository import (TradeRepository, WriteRejected, UPDATABLE_FIELDS, new_trade_fields,
+                        updated_trade_fields)
+
+
+class SqlTradeRepository(TradeRepository):
+    """Trades in the relational database configured by database.py"""
+
+    name = 'sql'
+
+    def init_app(self, app):
+        db_config.create_tables()
+        db_config.init_app(app)
+        with db_config.SessionLocal() as db:
+            ensure_aggregates(db)
+
+    def _find(self, db, trade_id, for_update=False):
+        try:
+            trade_id = int(trade_id)
+        except (TypeError, ValueError):
+            return None
+        query = db.query(Trade).filter(Trade.id == trade_id)
+        if for_update:
+            db_config.begin_write(db)
+            query = query.with_for_update()
+        return query.first()
+
+    def _commit_change(self, db, before, after):
+        apply_trade_change(db, before, after)
+        bump_data_version(db, 'trades')
+        db.commit()
+
+    def data_version(self):
+        return get_data_version(get_request_read_db(), 'trades')
+
+    # Trades
+
+    def list_trades(self, args):
+        return list_trades(get_request_read_db(), args)
+
+    def get_trade(self, trade_id):
+        trade = self._find(get_request_read_db(), trade_id)
+        return trade.to_dict() if trade else None
+
+    def create_trade(self, data):
+        db = get_request_db()
+        trade = Trade(**new_trade_fields(data, datetime.utcnow()))
+        db.add(trade)
+        self._commit_change(db, None, snapshot_trade(trade))
+        db.refresh(trade)
+        return trade.to_dict()
+
+    def update_trade(self, trade_id, data):
+        db = get_request_db()
+        trade = self._find(db, trade_id, for_update=True)
+        if not trade:
+            db.rollback()
+            return None
+
+        before = snapshot_trade(trade)
+        current = {field: getattr(trade, field) for field in UPDATABLE_FIELDS + ('closed_at',)}
+        for field, value in updated_trade_fields(current, data, datetime.utcnow()).items():
+            setattr(trade, field, value)
+
+        self._commit_change(db, before, snapshot_trade(trade))
+        return trade.to_dict()
+
+    def delete_trade(self, trade_id):
+        db = get_request_db()
+        trade = self._find(db, trade_id, for_update=True)
+        if not trade:
+            db.rollback()
+            return False
+
+        before = snapshot_trade(trade)
+        db.query(TradeImage).filter(TradeImage.trade_id == trade.id).delete(synchronize_session=False)
+        if not db.query(Trade).filter(Trade.id == trade.id).delete(synchronize_session=False):
+            db.rollback()  # Deleted by a concurrent request: its delta is already applied
+            return False
+        self._commit_change(db, before, None)
+        return True
+
+    def insert_trades(self, trades):
+        # One executemany INSERT; aggregates and data version in the same transaction
+        db = get_request_db()
+        try:
+            db.execute(insert(Trade), trades)
+            apply_trade_changes(db, [
+                (None, snapshot_values(row['account_id'], row['status'], row['pnl'], row['closed_at']))
+                for row in trades
+            ])
+            bump_data_version(db, 'trades')
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise WriteRejected(str(getattr(e, 'orig', None) or e)) from e
+
+    def export_trades(self, start=None, end=None, account_id=None):
+        # Column-only query streamed through a server-side cursor
+        query = get_request_read_db().query(*Trade.__table__.columns)
+        if start is not None:
+            query = query.filter(Trade.created_at >= start)
+        if end is not None:
+            query = query.filter(Trade.created_at < end)
+        if account_id is not None:
+            query = query.filter(Trade.account_id == account_id)
+        columns = [column.name for column in Trade.__table__.columns]
+        return columns, query.order_by(Trade.id).yield_per(EXPORT_CHUNK_ROWS)
+
+    # Statistics
+
+    def account_stats(self, account_id=None):
+        return build_account_stats(get_request_read_db(), account_id)
+
+    def metrics(self, account_id=None):
+        return build_metrics(get_request_read_db(), account_id)
+
+    def daily_series(self, account_id=None):
+        return build_daily_series(get_request_read_db(), account_id)
+
+    def monthly_stats(self, year, month, account_id=None):
+        return build_monthly_stats(get_request_read_db(), year, month, account_id)
+
+    def closed_trade_rows(self, account_id=None):
+        return query_closed_trades(get_request_read_db(), account_id)
+
+    def advanced_stats(self, account_id=None):
+        return build_advanced_stats(get_request_read_db(), account_id)
+
+    # Dashboard
+
+    def dashboard_snapshot(self, account_id=None, limit=None, cursor=None):
+        # One read session for every part, with keyset paging of recent trades
+        return build_dashboard_snapshot(get_request_read_db(), account_id, limit, cursor)
@@ -0,0 +1,236 @@
+"""
+Fingerprinted frontend assets served from a manifest built at startup
+
+Every file under the frontend directory gets a content-hashed URL
+(css/styles.css -> css/styles.<hash>.css), and the HTML entry pages are
+rewritten to reference those URLs. Hashed URLs are served with
+Cache-Control: immutable; plain URLs (HTML, and anything requested
+without a hash) revalidate against a content ETag.
+
+Files up to STATIC_CACHE_MAX_SIZE are kept in memory together with their
+.br/.gz variants (the build-time siblings from precompress_static.py when
+fresh, otherwise compressed once here). Larger files go through
+compression.send_static(). Unknown asset paths get a small 404 instead of
+the SPA page; paths without an extension fall back to index.html.
+"""
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+from pathlib import Path
+from flask import request, jsonify
+from werkzeug.exceptions import NotFound
+from compression import (brotli, compress_bytes, is_compressible, send_static,
+                         COMPRESS_MIN_SIZE, STATIC_ENCODINGS)
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STATIC_CACHE_MAX_SIZE = int(os.getenv('STATIC_CACHE_MAX_SIZE', str(256 * 1024)))
+# app.debug is only set by app.run(), after the manifest is built, so reload
+# follows the same FLASK_ENV check the entry points use for debug
+STATIC_RELOAD = os.getenv(
+    'STATIC_RELOAD', str(os.getenv('FLASK_ENV') != 'production')
+).lower() == 'true'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+SPA_INDEX = 'index.html'
+MIN_SAVING = 0.1
+
+# src="..." / href="..." attribute values in HTML pages
+ASSET_REFERENCE = re.compile(r'''(\b(?:src|href)=["'])([^"'?#:]+)(["'])''')
+
+
+def _hashed_name(path, digest):
+    root, ext = posixpath.splitext(path)
+    return f'{root}.{digest[:10]}{ext}'
+
+
+class Asset:
+    """One frontend file and its in-memory representations"""
+
+    def __init__(self, path, file_path, data, mimetype):
+        self.path = path
+        self.file_path = file_path
+        self.size = len(data)
+        self.mimetype = mimetype
+        self.digest = hashlib.sha256(data).hexdigest()
+        self.hashed_path = None if self.is_page else _hashed_name(path, self.digest)
+        self.mtime = os.path.getmtime(file_path)
+        self.data = data if self.size <= STATIC_CACHE_MAX_SIZE else None
+        self.encoded = {}  # encoding -> bytes
+
+    @property
+    def is_page(self):
+        return self.mimetype == 'text/html'
+
+    def set_data(self, data):
+        """Replace the served body (rewritten HTML); the ETag follows it"""
+        self.data = data
+        self.size = len(data)
+        self.digest = hashlib.sha256(data).hexdigest()
+
+    def load_encodings(self):
+        """Fresh build-time siblings, else compress once now"""
+        if (self.data is None or self.size < COMPRESS_MIN_SIZE
+                or not is_compressible(self.mimetype)):
+            return
+        for encoding, suffix in STATIC_ENCODINGS:
+            sibling = self.file_path + suffix
+            # Pages are rewritten, so their siblings never match the body
+            if (not self.is_page and os.path.isfile(sibling)
+                    and os.path.getmtime(sibling) >= self.mtime):
+                encoded = Path(sibling).read_bytes()
+            elif encoding == 'br' and brotli is None:
+                continue
+            else:
+                encoded = compress_bytes(self.data, encoding)
+            if len(encoded) <= self.size * (1 - MIN_SAVING):
+                self.encoded[encoding] = encoded
+
+
+class AssetManifest:
+    """Logical and hashed URL lookup for every file in a directory"""
+
+    def __init__(self, directory, reload=False):
+        self.directory = str(directory)
+        self.reload = reload
+        self._snapshot = None
+        self.assets = {}
+        self.hashed = {}
+        self.build()
+
+    def _scan(self):
+        files = []
+        for root, dirs, names in os.walk(self.directory):
+            dirs.sort()
+            for name in sorted(names):
+                if name.endswith(('.br', '.gz', '.tmp')):
+                    continue
+                file_path = os.path.join(root, name)
+                stat = os.stat(file_path)
+                files.append((file_path, stat.st_mtime, stat.st_size))
+        return files
+
+    def build(self):
+        snapshot = self._scan()
+        assets = {}
+        for file_path, _, _ in snapshot:
+            path = Path(os.path.relpath(file_path, self.directory)).as_posix()
+            mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            assets[path] = Asset(path, file_path, Path(file_path).read_bytes(), mimetype)
+
+        hashed = {asset.hashed_path: asset for asset in assets.values() if asset.hashed_path}
+        for asset in assets.values():
+            if asset.is_page and asset.data is not None:
+                asset.set_data(self._rewrite_page(asset, assets))
+            asset.load_encodings()
+
+        self.assets, self.hashed, self._snapshot = assets, hashed, snapshot
+
+    def _rewrite_page(self, page, assets):
+        """Point src/href references in an HTML page at hashed URLs"""
+        base = posixpath.dirname(page.path)
+
+        def replace(match):
+            prefix, value, suffix = match.groups()
+            if value.startswith('/'):
+                target = posixpath.normpath(value.lstrip('/'))
+            else:
+                target = posixpath.normpath(posixpath.join(base, value))
+            asset = assets.get(target)
+            if asset is None or asset.hashed_path is None:
+                return match.group(0)
+            if value.startswith('/'):
+                url = '/' + asset.hashed_path
+            else:
+                url = posixpath.relpath(asset.hashed_path, base or '.')
+            return prefix + url + suffix
+
+        return ASSET_REFERENCE.sub(replace, page.data.decode('utf-8')).encode('utf-8')
+
+    def refresh(self):
+        """Rebuild if any file changed (development reload mode)"""
+        if self._scan() != self._snapshot:
+            self.build()
+
+    def url_for(self, path):
+        """Hashed URL for a logical asset path (or the path if unknown)"""
+        asset = self.assets.get(path)
+        return '/' + (asset.hashed_path if asset and asset.hashed_path else path)
+
+    def lookup(self, path):
+        """(asset, is_hashed_url) for a request path; (None, False) if unknown"""
+        if self.reload:
+            self.refresh()
+        asset = self.hashed.get(path)
+        if asset is not None:
+            return asset, True
+        return self.assets.get(path), False
+
+    def to_dict(self):
+        return {
+            path: {
+                'url': self.url_for(path),
+                'size': asset.size,
+                'cached': asset.data is not None,
+                'encodings': sorted(asset.encoded)
+            }
+            for path, asset in self.assets.items()
+        }
+
+
+def asset_response(app, manifest, asset, hashed):
+    """Response for an asset from memory, or from disk if it is too large"""
+    if asset.data is None:
+        response = send_static(manifest.directory, asset.path)
+    else:
+        encoding = next((e for e, _ in STATIC_ENCODINGS
+                         if e in asset.encoded and request.accept_encodings[e]), None)
+        body = asset.encoded[encoding] if encoding else asset.data
+        response = app.response_class(body, mimetype=asset.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if asset.encoded:
+            response.vary.add('Accept-Encoding')
+        response.set_etag(f"{asset.digest[:16]}{'-' + encoding if encoding else ''}")
+        response.last_modified = asset.mtime
+        response.make_conditional(request)
+
+    response.headers['Cache-Control'] = IMMUTABLE if hashed else REVALIDATE
+    return response
+
+
+def not_found(path):
+    if path.startswith('api/'):
+        return jsonify({'error': 'Not found'}), 404
+    return 'Not found', 404, {'Content-Type': 'text/plain; charset=utf-8'}
+
+
+def register_static_assets(app, directory=None):
+    """Build the manifest and serve the frontend from it
+
+    Replaces Flask's static endpoint; returns serve(path) for routes that
+    serve pages (/, /admin.html, the SPA catch-all). Outside production
+    (or with STATIC_RELOAD=true) the manifest is rebuilt whenever a file
+    changes.
+    """
+    manifest = AssetManifest(directory or app.static_folder, reload=STATIC_RELOAD or app.debug)
+    app.extensions['static_assets'] = manifest
+
+    def serve(path):
+        asset, hashed = manifest.lookup(path)
+        if asset is not None:
+            return asset_response(app, manifest, asset, hashed)
+        # Unknown file-like paths are missing assets, not client-side routes
+        if path.startswith('api/') or posixpath.splitext(path)[1]:
+            return not_found(path)
+        index, _ = manifest.lookup(SPA_INDEX)
+        if index is None:
+            raise NotFound()
+        return asset_response(app, manifest, index, False)
+
+    if 'static' in app.view_functions:
+        app.view_functions['static'] = lambda filename: serve(filename)
+    return serve
@@ -0,0 +1,106 @@
+"""
+Statistics builders shared by the sync (Flask) and async (ASGI) apps
+
+Each builder takes a synchronous SQLAlchemy session and returns a plain
+dict/list ready for JSON serialization.
+"""
+from sqlalchemy import func, case
+from sqlalchemy.orm import selectinload
+from models import Trade
+from aggregates import get_account_stats_row, query_daily_pnl
+from analytics import closed_trade_arrays, compute_advanced_metrics
+from pagination import parse_limit, keyset_page, encode_cursor
+from repository import (account_summary, metrics_summary, monthly_summary, month_bounds,
+                        SNAPSHOT_PAGE_SIZE)
+
+
+def build_account_stats(db, account_id=None):
+    """Account summary from the persisted account_stats aggregate"""
+    stats = get_account_stats_row(db, account_id)
+    if not stats:
+        return account_summary(0, 0, 0, 0)
+    return account_summary(stats.total_pnl, stats.closed_trades, stats.open_trades,
+                           stats.winning_trades)
+
+
+def build_metrics(db, account_id=None):
+    """Performance metrics over closed trades"""
+    is_win = Trade.pnl > 0
+    is_loss = Trade.pnl < 0
+    
+    # Single aggregate over closed trades - no ORM rows are loaded
+    query = db.query(
+        func.count(Trade.id),
+        func.count(case((is_win, 1))),
+        func.count(case((is_loss, 1))),
+        func.coalesce(func.sum(case((is_win, Trade.pnl), else_=0)), 0),
+        func.coalesce(func.sum(case((is_loss, Trade.pnl), else_=0)), 0),
+        func.coalesce(func.max(case((is_win, Trade.pnl))), 0),
+        func.coalesce(func.min(case((is_loss, Trade.pnl))), 0),
+        func.avg(Trade.total_confluence)
+    ).filter(Trade.status == 'CLOSED')
+    if account_id is not None:
+        query = query.filter(Trade.account_id == account_id)
+    return metrics_summary(*query.one())
+
+
+def build_daily_series(db, account_id=None):
+    """Closed-trade P&L per day from the daily_pnl rollup"""
+    return [
+        {'date': day.isoformat(), 'pnl': round(pnl, 2)}
+        for day, pnl, _ in query_daily_pnl(db, account_id=account_id)
+    ]
+
+
+def build_monthly_stats(db, year, month, account_id=None):
+    """Calendar month summary and per-day breakdown from the daily_pnl rollup"""
+    start_date, end_date = month_bounds(year, month)
+    days = [
+        (day.isoformat(), pnl, trades)
+        for day, pnl, trades in query_daily_pnl(db, start_date, end_date, account_id)
+    ]
+    return monthly_summary(year, month, days)
+
+
+def query_closed_trades(db, account_id=None):
+    """(pnl, closed_at, entry_price, stop_loss, lot_size) per closed trade in close order"""
+    query = db.query(
+        Trade.pnl, Trade.closed_at, Trade.entry_price, Trade.stop_loss, Trade.lot_size
+    ).filter(
+        Trade.status == 'CLOSED',
+        Trade.closed_at.isnot(None)
+    )
+    if account_id is not None:
+        query = query.filter(Trade.account_id == account_id)
+    return query.order_by(Trade.closed_at, Trade.id).all()
+
+
+def build_advanced_stats(db, account_id=None):
+    """Equity curve, drawdown, risk ratios and R-multiples over closed trades"""
+    return compute_advanced_metrics(closed_trade_arrays(query_closed_trades(db, account_id)))
+
+
+def build_dashboard_snapshot(db, account_id=None, limit=None, cursor=None):
+    """Everything the dashboard needs, computed on one session
+
+    account_id scopes every part of the snapshot; limit/cursor page the
+    recent-trades list (default page size SNAPSHOT_PAGE_SIZE). Raises
+    InvalidQuery for malformed values.
+    """
+    limit = parse_limit(limit) or SNAPSHOT_PAGE_SIZE
+    trades = db.query(Trade)
+    if account_id is not None:
+        trades = trades.filter(Trade.account_id == account_id)
+    recent, has_more = keyset_page(
+        trades.options(selectinload(Trade.images)), Trade, cursor, limit
+    )
+    open_trades = trades.filter(Trade.status == 'OPEN').all()
+    
+    return {
+        'account': build_account_stats(db, account_id),
+        'metrics': build_metrics(db, account_id),
+        'daily': build_daily_series(db, account_id),
+        'trades': [trade.to_dict() for trade in recent],
+        'next_cursor': encode_cursor(recent[-1].created_at, recent[-1].id) if has_more else None,
+        'open_trades': [trade.to_dict(include_images=False) for trade in open_trades]
+    }
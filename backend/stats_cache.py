@@ -0,0 +1,122 @@
+"""
+Bounded LRU cache for computed trade statistics
+
+Entries are keyed by endpoint plus resolved arguments and tagged with the
+repository's data version (the SQL or Mongo trades data version, or the
+JSON store's generation and journal offset). Every trade write changes that
+version, so the first lookup after a write from any worker drops the whole
+cache. Write routes in this process also call invalidate() directly; the
+TTL is a safety net for writes that bypass both.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _older(version, current):
+    return version is not None and current is not None and version < current
+
+
+class StatsCache:
+    """Thread-safe LRU of computed results with TTL and version invalidation"""
+
+    def __init__(self, max_entries=256, ttl=60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._version = None
+        self._epoch = 0  # bumped whenever entries are invalidated
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, key, version, compute):
+        """Cached value for key at this data version, computing it on a miss
+
+        Versions only grow. Read the version before computing, so an entry
+        can only be tagged older than its value, never newer.
+        """
+        if self.max_entries <= 0:
+            return compute()
+
+        now = time.monotonic()
+        with self._lock:
+            value = self._lookup(key, version, now)
+            # None for a stale version: its result must not be stored
+            epoch = self._epoch if version == self._version else None
+        if value is not None:
+            return value
+
+        value = compute()
+
+        with self._lock:
+            # Skip storing if a write or newer version arrived while computing
+            if epoch is not None and epoch == self._epoch:
+                self._entries[key] = (now + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def _lookup(self, key, version, now):
+        """Fresh cached value or None, counting the hit or miss (lock held)"""
+        if _older(version, self._version):
+            # Version read before a write another request has already seen
+            self.misses += 1
+            return None
+
+        if version != self._version:
+            self._clear()
+            self._version = version
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+            self.expirations += 1
+        self.misses += 1
+        return None
+
+    def invalidate(self):
+        """Drop every entry (called after trade writes commit)"""
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        if self._entries:
+            self._entries.clear()
+            self.invalidations += 1
+        self._epoch += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+
+stats_cache = StatsCache(
+    max_entries=int(os.getenv('STATS_CACHE_SIZE', '256')),
+    ttl=float(os.getenv('STATS_CACHE_TTL', '60'))
+)
@@ -0,0 +1,210 @@
+"""
+Trade API routes shared by every storage backend
+
+register_trade_routes() wires the trade CRUD, import/export, statistics and
+dashboard endpoints to a TradeRepository, caching statistics in stats_cache until the next trade
+write; create_app() builds a standalone app around them for the
+lightweight JSON and Mongo entry points (app_simple.py, app_mongo.py).
+"""
+from datetime import datetime
+from pathlib import Path
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask_cors import CORS
+from stats_cache import stats_cache
+from exporter import iter_csv, iter_ndjson
+from importer import import_trades, DEFAULT_BATCH_SIZE, MAX_BATCH_SIZE
+from json_provider import init_json
+from compression import register_compression
+from static_assets import register_static_assets
+
+frontend_dir = Path(__file__).parent.parent / 'frontend'
+
+
+def register_trade_routes(app, repository):
+    """Add /api/trades* and /api/dashboard/snapshot routes backed by repository to app"""
+
+    @app.route('/api/trades', methods=['GET'])
+    def get_trades():
+        """List trades newest first
+
+        The SQL backend also supports limit and cursor for keyset pagination
+        (the next cursor is returned in the X-Next-Cursor header), fields for
+        a comma-separated column projection, and include (default "images")
+        to choose nested relations.
+        """
+        try:
+            items, next_cursor = repository.list_trades(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        response = jsonify(items)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+
+    @app.route('/api/trades/<trade_id>', methods=['GET'])
+    def get_trade(trade_id):
+        trade = repository.get_trade(trade_id)
+        if not trade:
+            return jsonify({'error': 'Trade not found'}), 404
+        return jsonify(trade)
+
+    @app.route('/api/trades', methods=['POST'])
+    def create_trade():
+        trade = repository.create_trade(request.json)
+        stats_cache.invalidate()
+        return jsonify(trade), 201
+
+    @app.route('/api/trades/<trade_id>', methods=['PUT'])
+    def update_trade(trade_id):
+        trade = repository.update_trade(trade_id, request.json)
+        if not trade:
+            return jsonify({'error': 'Trade not found'}), 404
+        stats_cache.invalidate()
+        return jsonify(trade)
+
+    @app.route('/api/trades/<trade_id>/close', methods=['POST'])
+    def close_trade(trade_id):
+        trade = repository.close_trade(trade_id, request.json['exit_price'])
+        if not trade:
+            return jsonify({'error': 'Trade not found'}), 404
+        stats_cache.invalidate()
+        return jsonify(trade)
+
+    @app.route('/api/trades/<trade_id>', methods=['DELETE'])
+    def delete_trade(trade_id):
+        if not repository.delete_trade(trade_id):
+            return jsonify({'error': 'Trade not found'}), 404
+        stats_cache.invalidate()
+        return '', 204
+
+    @app.route('/api/trades/import', methods=['POST'])
+    def import_trades_route():
+        """Bulk import trades from a CSV or NDJSON request body
+
+        The format comes from ?format=csv|ndjson or the Content-Type header.
+        Rows are validated as they stream in and stored in batches of
+        ?batch_size= rows, each batch in one write; rows of a batch the
+        store rejects are reported with the invalid ones.
+        """
+        fmt = request.args.get('format')
+        if not fmt:
+            fmt = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+        if fmt not in ('csv', 'ndjson'):
+            return jsonify({'error': 'format must be csv or ndjson'}), 400
+        
+        batch_size = request.args.get('batch_size', DEFAULT_BATCH_SIZE, type=int)
+        batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        
+        try:
+            report = import_trades(repository, request.stream, fmt, batch_size)
+        finally:
+            stats_cache.invalidate()  # Earlier batches are stored even if a later one fails
+        return jsonify(report)
+
+    @app.route('/api/trades/export', methods=['GET'])
+    def export_trades():
+        """Stream the trade journal as CSV or NDJSON
+
+        Optional filters: start and end (ISO dates/timestamps on created_at,
+        end exclusive) and account_id.
+        """
+        fmt = request.args.get('format', 'csv')
+        if fmt not in ('csv', 'ndjson'):
+            return jsonify({'error': 'format must be csv or ndjson'}), 400
+        
+        try:
+            start = request.args.get('start')
+            end = request.args.get('end')
+            start = datetime.fromisoformat(start) if start else None
+            end = datetime.fromisoformat(end) if end else None
+        except ValueError:
+            return jsonify({'error': 'start and end must be ISO 8601 dates'}), 400
+        
+        columns, rows = repository.export_trades(start, end, request.args.get('account_id', type=int))
+        if fmt == 'csv':
+            body, mimetype = iter_csv(columns, rows), 'text/csv'
+        else:
+            body, mimetype = iter_ndjson(columns, rows), 'application/x-ndjson'
+        
+        filename = f"trades_export_{datetime.utcnow().strftime('%Y-%m-%d')}.{fmt}"
+        return Response(
+            stream_with_context(body),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+
+    def cached_stats(key, compute):
+        version = repository.data_version()
+        if version is None:
+            # No shared version: another worker's writes would go unnoticed
+            return jsonify(compute())
+        return jsonify(stats_cache.get_or_compute(key, version, compute))
+
+    @app.route('/api/trades/stats/account', methods=['GET'])
+    def get_account_stats():
+        account_id = request.args.get('account_id', type=int)
+        return cached_stats(('account', account_id), lambda: repository.account_stats(account_id))
+
+    @app.route('/api/trades/stats/metrics', methods=['GET'])
+    def get_metrics():
+        account_id = request.args.get('account_id', type=int)
+        return cached_stats(('metrics', account_id), lambda: repository.metrics(account_id))
+
+    @app.route('/api/trades/stats/daily', methods=['GET'])
+    def get_daily_stats():
+        account_id = request.args.get('account_id', type=int)
+        return cached_stats(('daily', account_id), lambda: repository.daily_series(account_id))
+
+    @app.route('/api/trades/stats/monthly', methods=['GET'])
+    def get_monthly_stats():
+        year = request.args.get('year', datetime.utcnow().year, type=int)
+        month = request.args.get('month', datetime.utcnow().month, type=int)
+        account_id = request.args.get('account_id', type=int)
+        return cached_stats(('monthly', year, month, account_id),
+                            lambda: repository.monthly_stats(year, month, account_id))
+
+    @app.route('/api/trades/stats/advanced', methods=['GET'])
+    def get_advanced_stats():
+        """Equity curve, drawdown, Sharpe/Sortino, expectancy and R-multiples"""
+        account_id = request.args.get('account_id', type=int)
+        return cached_stats(('advanced', account_id), lambda: repository.advanced_stats(account_id))
+
+    @app.route('/api/dashboard/snapshot', methods=['GET'])
+    def get_dashboard_snapshot():
+        """Everything the dashboard needs in one round trip
+
+        account_id scopes every part of the snapshot; limit sizes the
+        recent-trades list (default 50) and the SQL backend also pages it
+        with cursor, like GET /api/trades.
+        """
+        try:
+            snapshot = repository.dashboard_snapshot(
+                request.args.get('account_id', type=int),
+                request.args.get('limit'), request.args.get('cursor')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(snapshot)
+
+    return app
+
+
+def create_app(repository):
+    """Standalone app serving the frontend and the trade API"""
+    app = Flask(__name__, static_folder=str(frontend_dir), static_url_path='')
+    init_json(app)
+    CORS(app, expose_headers=['X-Next-Cursor'])
+    register_compression(app)
+    serve_asset = register_static_assets(app)
+    repository.init_app(app)
+
+    @app.route('/')
+    def serve_index():
+        return serve_asset('index.html')
+
+    @app.route('/<path:path>')
+    def serve_static(path):
+        return serve_asset(path)
+
+    return register_trade_routes(app, repository)
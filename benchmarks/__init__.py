@@ -0,0 +1,9 @@
+"""
+Benchmarks and load tests for the trading dashboard backend
+
+Standalone scripts (bench_*.py) run with ``python benchmarks/<script>.py``;
+the seeding and load-test suite runs as modules:
+
+    python -m benchmarks.datagen --trades 100000 --db /tmp/bench.db
+    python -m benchmarks.loadtest --sizes 10k,100k,1m --output results.json
+"""
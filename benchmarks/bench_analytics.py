@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark backend/analytics.py against a naive per-trade loop
+
+Generates synthetic closed trades in memory (no database), computes the
+advanced metrics both ways, checks they agree and prints the timings.
+
+    python benchmarks/bench_analytics.py [--trades 1000000]
+"""
+import argparse
+import math
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+import analytics  # noqa: E402
+
+
+def generate(count, seed=42):
+    """Synthetic closed trades: ~60 per day with a slight positive edge"""
+    rng = np.random.default_rng(seed)
+    pnl = np.round(rng.normal(5, 250, count), 2)
+    seconds = np.sort(rng.integers(0, count // 60 * 86400 + 86400, count))
+    closed_at = np.datetime64('2020-01-01T00:00:00') + seconds.astype('timedelta64[s]')
+    risk = np.where(rng.random(count) < 0.7, rng.uniform(50, 500, count), np.nan)
+    return {'pnl': pnl, 'closed_at': closed_at, 'risk': risk}
+
+
+def naive_metrics(pnl, closed_at, risk, starting_balance=100000):
+    """Reference implementation using plain Python loops"""
+    equity = starting_balance
+    peak = starting_balance
+    worst = 0.0
+    worst_pct = 0.0
+    daily = {}
+    order = []
+    for value, when in zip(pnl, closed_at):
+        equity += value
+        peak = max(peak, equity)
+        if equity - peak < worst:
+            worst = equity - peak
+            worst_pct = worst / peak * 100
+        day = when.date()
+        if day not in daily:
+            daily[day] = [0.0, 0.0]
+            order.append(day)
+        daily[day][0] += value
+        daily[day][1] = equity
+
+    returns = []
+    for day in order:
+        day_pnl, day_equity = daily[day]
+        opening = day_equity - day_pnl
+        returns.append(day_pnl / opening if opening else 0.0)
+    mean = sum(returns) / len(returns)
+    std = math.sqrt(sum((r - mean) ** 2 for r in returns) / (len(returns) - 1))
+    downside = math.sqrt(sum(min(r, 0) ** 2 for r in returns) / len(returns))
+
+    r_values = [p / k for p, k in zip(pnl, risk) if k == k and k > 0]
+
+    return {
+        'expectancy': round(sum(pnl) / len(pnl), 2),
+        'max_drawdown': round(-worst, 2),
+        'max_drawdown_pct': round(-worst_pct, 2),
+        'sharpe_ratio': round(mean / std * math.sqrt(252), 2),
+        'sortino_ratio': round(mean / downside * math.sqrt(252), 2),
+        'average_r': round(sum(r_values) / len(r_values), 2),
+        'trades_with_r': len(r_values)
+    }
+
+
+def timed(label, func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<12} {elapsed:8.3f}s")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--trades', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"Generating {args.trades:,} trades...")
+    trades = generate(args.trades)
+
+    # The naive version gets Python objects, as it would from the ORM
+    pnl_list = trades['pnl'].tolist()
+    closed_list = [datetime(2020, 1, 1) + timedelta(seconds=int(s))
+                   for s in (trades['closed_at'] - np.datetime64('2020-01-01T00:00:00')).astype(int)]
+    risk_list = trades['risk'].tolist()
+
+    vectorized, fast = timed('vectorized', analytics.compute_advanced_metrics, trades)
+    naive, slow = timed('naive loop', naive_metrics, pnl_list, closed_list, risk_list)
+
+    mismatches = {key: (vectorized[key], value) for key, value in naive.items()
+                  if abs(vectorized[key] - value) > 0.011}
+    if mismatches:
+        print(f"❌ Results differ: {mismatches}")
+        return 1
+
+    print(f"✅ Results match, speedup {slow / fast:.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Load test: sync Flask app (gunicorn, 1 sync worker) vs async ASGI app
+(uvicorn, 1 process) on the read endpoints
+
+Seeds a temporary SQLite database, starts each server in turn, drives it
+with N concurrent keep-alive clients for a fixed time and prints p50/p99
+latency and throughput as JSON. The sync app's stats cache is disabled
+(STATS_CACHE_SIZE=0): the ASGI app has none, so both recompute every
+request.
+
+    python benchmarks/bench_asgi_vs_wsgi.py [--clients 32] [--seconds 15] [--seed 50000]
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+BACKEND_DIR = PROJECT_ROOT / 'backend'
+ENDPOINTS = [
+    '/api/trades/stats/account',
+    '/api/trades/stats/metrics',
+    '/api/trades/stats/daily',
+    '/api/trades/stats/monthly?year=2024&month=6',
+    '/api/trades/stats/advanced',
+    '/api/trades?limit=50',
+    '/api/dashboard/snapshot',
+]
+SERVERS = {
+    'wsgi': ['gunicorn', '--bind', '127.0.0.1:{port}', '--workers', '1',
+             '--chdir', str(BACKEND_DIR), 'app:app'],
+    'asgi': ['uvicorn', '--host', '127.0.0.1', '--port', '{port}', '--workers', '1',
+             '--log-level', 'warning', '--app-dir', str(PROJECT_ROOT), 'asgi:app'],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def seed_database(env, count):
+    """Import synthetic closed trades through the sync app in a child process"""
+    script = f'''
+import json, sys
+sys.path.insert(0, {str(BACKEND_DIR)!r})
+from app import app
+rows = (json.dumps({{
+    'symbol': ['EURUSD', 'GBPUSD', 'USDJPY'][i % 3], 'direction': 'LONG' if i % 2 else 'SHORT',
+    'entry_price': 1.1, 'exit_price': 1.1 + (i % 9 - 4) / 1000, 'lot_size': 0.1,
+    'closed_at': f'2024-{{i % 12 + 1:02d}}-{{i % 28 + 1:02d}}T{{i % 24:02d}}:00:00'
+}}) for i in range({count}))
+app.test_client().post('/api/trades/import', data='\\n'.join(rows), content_type='application/x-ndjson')
+'''
+    subprocess.run([sys.executable, '-c', script], env=env, check=True)
+
+
+def wait_until_ready(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/api/trades/stats/account')
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+def drive(port, clients, seconds):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.time() + seconds
+
+    def client(offset):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        i = offset
+        local = []
+        while time.time() < deadline:
+            started = time.perf_counter()
+            try:
+                conn.request('GET', ENDPOINTS[i % len(ENDPOINTS)])
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                ok = False
+            if ok:
+                local.append(time.perf_counter() - started)
+            else:
+                with lock:
+                    errors[0] += 1
+            i += 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'throughput_rps': round(len(latencies) / seconds, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--seed', type=int, default=50000, help='trades to preload')
+    parser.add_argument('--servers', default='wsgi,asgi')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DB_PATH=str(Path(tmp) / 'bench.db'), DATABASE_URL='',
+                   FLASK_ENV='production', STATS_CACHE_SIZE='0')
+        seed_database(env, args.seed)
+
+        for name in args.servers.split(','):
+            port = free_port()
+            command = [part.format(port=port) for part in SERVERS[name]]
+            server = subprocess.Popen(command, env=env, cwd=PROJECT_ROOT,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_until_ready(port)
+                results[name] = drive(port, args.clients, args.seconds)
+            finally:
+                server.terminate()
+                server.wait()
+            print(json.dumps({'server': name, 'clients': args.clients, **results[name]}))
+
+    if 'wsgi' in results and 'asgi' in results:
+        print(json.dumps({
+            'p50_ratio': round(results['asgi']['p50_ms'] / (results['wsgi']['p50_ms'] or 1), 2),
+            'p99_ratio': round(results['asgi']['p99_ms'] / (results['wsgi']['p99_ms'] or 1), 2),
+            'throughput_ratio': round(results['asgi']['throughput_rps'] / (results['wsgi']['throughput_rps'] or 1), 2),
+        }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Run identical create/list/stats workloads against each trade backend
+
+Each backend (sql, json, mongo) gets a fresh temporary store and its own
+process; requests go through trade_api.create_app() with the Flask test
+client, so the numbers cover routing, the repository and storage but not
+HTTP. Mongo uses mongomock unless --mongo-uri points at a real server.
+Prints one JSON line per backend and workload.
+
+    python benchmarks/bench_backends.py [--trades 2000] [--reads 200] [--backends sql,json,mongo]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent / 'backend'
+READ_WORKLOADS = {
+    'list': '/api/trades',
+    'get': '/api/trades/{id}',
+    'stats_account': '/api/trades/stats/account',
+    'stats_metrics': '/api/trades/stats/metrics',
+    'stats_daily': '/api/trades/stats/daily',
+    'stats_monthly': '/api/trades/stats/monthly',
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(latencies, elapsed):
+    return {
+        'requests': len(latencies),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def trade_payload(i):
+    closed = i % 4 != 0
+    return {
+        'symbol': ['EURUSD', 'GBPUSD', 'USDJPY'][i % 3],
+        'direction': 'LONG' if i % 2 else 'SHORT',
+        'entry_price': 1.1,
+        'exit_price': 1.1 + (i % 9 - 4) / 1000 if closed else None,
+        'lot_size': 0.1,
+        'weekly_tf': i % 6,
+        'h4_tf': (i * 7) % 6,
+    }
+
+
+def timed(client, method, path, count, expected, payload=None):
+    latencies = []
+    bodies = []
+    started = time.perf_counter()
+    for i in range(count):
+        t0 = time.perf_counter()
+        response = client.open(path(i) if callable(path) else path, method=method,
+                               json=payload(i) if payload else None)
+        latencies.append(time.perf_counter() - t0)
+        if response.status_code != expected:
+            raise RuntimeError(f'{method} {response.request.path} -> {response.status_code}')
+        bodies.append(response)
+    return summarize(latencies, time.perf_counter() - started), bodies
+
+
+def run_backend(backend, trades, reads):
+    """Benchmark one backend in this process (env already points at temp stores)"""
+    sys.path.insert(0, str(BACKEND_DIR))
+    from repository import create_repository
+    from trade_api import create_app
+
+    client = create_app(create_repository(backend)).test_client()
+    results = {}
+
+    results['create'], created = timed(client, 'POST', '/api/trades', trades, 201, trade_payload)
+    ids = [response.json['id'] for response in created]
+
+    results['update'], _ = timed(client, 'PUT', lambda i: f'/api/trades/{ids[i % len(ids)]}',
+                                 reads, 200, lambda i: {'exit_price': 1.105, 'daily_tf': i % 6})
+
+    for name, path in READ_WORKLOADS.items():
+        results[name], _ = timed(client, 'GET', lambda i: path.format(id=ids[i % len(ids)]),
+                                 reads, 200)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--trades', type=int, default=2000, help='trades created per backend')
+    parser.add_argument('--reads', type=int, default=200, help='requests per read/update workload')
+    parser.add_argument('--backends', default='sql,json,mongo')
+    parser.add_argument('--mongo-uri', default='mongomock://localhost')
+    parser.add_argument('--run', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_backend(args.run, args.trades, args.reads)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends.split(','):
+            env = dict(
+                os.environ, TRADE_BACKEND=backend, FLASK_ENV='production', DATABASE_URL='',
+                DB_PATH=str(Path(tmp) / f'{backend}.db'),
+                DATA_FILE=str(Path(tmp) / f'{backend}.json'),
+                MONGODB_URI=args.mongo_uri, MONGODB_DB=f'bench_{os.getpid()}'
+            )
+            completed = subprocess.run(
+                [sys.executable, __file__, '--run', backend,
+                 '--trades', str(args.trades), '--reads', str(args.reads)],
+                env=env, capture_output=True, text=True
+            )
+            if completed.returncode != 0:
+                print(json.dumps({'backend': backend, 'error': completed.stderr.strip().splitlines()[-1]}))
+                continue
+            for workload, stats in json.loads(completed.stdout.strip().splitlines()[-1]).items():
+                print(json.dumps({'backend': backend, 'workload': workload, **stats}))
+
+
+if __name__ == '__main__':
+    main()
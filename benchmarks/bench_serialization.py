@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for list serialization: to_dict() + JSON encoding
+
+Seeds a temporary SQLite file, loads Trade (with images), Video and
+TradingAccount lists into memory once, then times turning each list into
+a Flask JSON response three ways:
+
+    attribute+stdlib   per-attribute dicts (the old hand-written to_dict())
+                       and the standard library encoder
+    generated+stdlib   mapper-generated serializers, standard library encoder
+    generated+orjson   mapper-generated serializers, orjson (if installed)
+
+    python benchmarks/bench_serialization.py [--trades 50000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent / 'backend'
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--trades', type=int, default=50000)
+    parser.add_argument('--videos', type=int, default=5000)
+    parser.add_argument('--accounts', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ['DB_PATH'] = str(Path(tmp.name) / 'serialization.db')
+    os.environ['DATABASE_URL'] = ''
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    from flask import Flask
+    from sqlalchemy.orm import selectinload
+    from database import db_config
+    from models import Trade, TradeImage, Video, TradingAccount
+    from serializers import model_serializer
+    from json_provider import StdlibJSONProvider, OrjsonProvider, orjson
+    from benchmarks.datagen import seed
+
+    db_config.create_tables()
+    with db_config.SessionLocal() as db:
+        seed(db, args.trades, args.videos, args.accounts)
+
+    app = Flask(__name__)
+    providers = {'stdlib': StdlibJSONProvider(app)}
+    if orjson is not None:
+        providers['orjson'] = OrjsonProvider(app)
+
+    with db_config.SessionLocal() as db:
+        trades = db.query(Trade).options(selectinload(Trade.images)).all()
+        videos = db.query(Video).all()
+        accounts = db.query(TradingAccount).all()
+
+        def trade_rows(serializer):
+            rows = []
+            for trade in trades:
+                row = serializer(Trade)(trade)
+                row['images'] = [serializer(TradeImage)(image) for image in trade.images]
+                rows.append(row)
+            return rows
+
+        lists = {
+            'Trade': (trades, trade_rows),
+            'Video': (videos, lambda serializer: [serializer(Video)(v) for v in videos]),
+            'TradingAccount': (accounts, lambda serializer: [serializer(TradingAccount)(a) for a in accounts]),
+        }
+
+        def by_attribute(model):
+            return model_serializer(model).by_attribute
+
+        variants = [('attribute+stdlib', by_attribute, 'stdlib'),
+                    ('generated+stdlib', model_serializer, 'stdlib'),
+                    ('generated+orjson', model_serializer, 'orjson')]
+
+        with app.app_context():
+            for model, (rows, build) in lists.items():
+                baseline = None
+                for name, serializers, provider in variants:
+                    if provider not in providers:
+                        continue
+                    json_provider = providers[provider]
+                    seconds = best_of(args.repeat,
+                                      lambda: json_provider.response(build(serializers)).get_data())
+                    baseline = baseline or seconds
+                    print(json.dumps({
+                        'model': model,
+                        'rows': len(rows),
+                        'variant': name,
+                        'ms': round(seconds * 1000, 1),
+                        'us_per_row': round(seconds / max(len(rows), 1) * 1e6, 2),
+                        'speedup': round(baseline / seconds, 2),
+                    }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+SQLite concurrency benchmark: read throughput while writes are in flight
+
+Runs the Flask app against a temporary SQLite file once per profile
+(development = default rollback journal, production = WAL pragmas plus the
+read-only pool). Writer processes create trades while reader processes hit
+the GET stats endpoints; read throughput and latency are reported per
+profile.
+
+    python benchmarks/bench_sqlite_concurrency.py [--seconds 10] [--readers 8] [--writers 2]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent / 'backend'
+READ_ENDPOINTS = [
+    '/api/trades/stats/account',
+    '/api/trades/stats/metrics',
+    '/api/trades/stats/daily',
+    '/api/trades/stats/monthly',
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _load_app():
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app import app
+    return app
+
+
+def _wait_until(start):
+    """Idle until the measured window opens, so warm-up is never counted"""
+    time.sleep(max(0.0, start - time.time()))
+
+
+def _writer(start, deadline, results):
+    client = _load_app().test_client()
+    _wait_until(start)
+    writes = errors = 0
+    while time.time() < deadline:
+        response = client.post('/api/trades', json={
+            'symbol': 'GBPUSD', 'direction': 'LONG',
+            'entry_price': 1.25, 'exit_price': 1.26, 'lot_size': 0.1
+        })
+        if response.status_code == 201:
+            writes += 1
+        else:
+            errors += 1
+    results.put(('writer', writes, errors, []))
+
+
+def _reader(offset, start, deadline, results):
+    client = _load_app().test_client()
+    _wait_until(start)
+    latencies = []
+    errors = 0
+    i = offset
+    while time.time() < deadline:
+        started = time.perf_counter()
+        response = client.get(READ_ENDPOINTS[i % len(READ_ENDPOINTS)])
+        if response.status_code == 200:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors += 1
+        i += 1
+    results.put(('reader', len(latencies), errors, latencies))
+
+
+def run_profile(args):
+    """Executed in a child process with SQLITE_PROFILE/DB_PATH already set
+
+    Readers and writers are separate processes (like gunicorn workers), so
+    the measurement reflects SQLite locking rather than the GIL.
+    """
+    seed = '\n'.join(json.dumps({
+        'symbol': 'EURUSD', 'direction': 'LONG' if i % 2 else 'SHORT',
+        'entry_price': 1.1, 'exit_price': 1.1 + (i % 7 - 3) / 1000, 'lot_size': 0.1,
+        'closed_at': f'2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}T12:00:00'
+    }) for i in range(args.seed))
+    _load_app().test_client().post('/api/trades/import', data=seed,
+                                   content_type='application/x-ndjson')
+
+    # Give every process time to import the app before the clock starts;
+    # only requests inside [start, deadline) are counted
+    start = time.time() + 3
+    deadline = start + args.seconds
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_writer, args=(start, deadline, results))
+               for _ in range(args.writers)]
+    workers += [multiprocessing.Process(target=_reader, args=(n, start, deadline, results))
+                for n in range(args.readers)]
+    for worker in workers:
+        worker.start()
+
+    collected = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    read_latencies = [value for kind, _, _, values in collected for value in values]
+    writes = sum(count for kind, count, _, _ in collected if kind == 'writer')
+
+    print(json.dumps({
+        'profile': os.environ['SQLITE_PROFILE'],
+        'reads_per_second': round(len(read_latencies) / args.seconds, 1),
+        'writes_per_second': round(writes / args.seconds, 1),
+        'read_p50_ms': round(percentile(read_latencies, 50) * 1000, 2),
+        'read_p99_ms': round(percentile(read_latencies, 99) * 1000, 2),
+        'read_errors': sum(errors for kind, _, errors, _ in collected if kind == 'reader'),
+        'write_errors': sum(errors for kind, _, errors, _ in collected if kind == 'writer'),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=20000, help='trades to preload')
+    parser.add_argument('--profiles', default='development,production')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_profile(args)
+        return
+
+    results = []
+    for profile in args.profiles.split(','):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, SQLITE_PROFILE=profile, DB_PATH=str(Path(tmp) / 'bench.db'),
+                       DATABASE_URL='', FLASK_ENV='production')
+            command = [sys.executable, __file__, '--child'] + sys.argv[1:]
+            output = subprocess.run(command, env=env, check=True, capture_output=True, text=True)
+            result = json.loads(output.stdout.strip().splitlines()[-1])
+            print(json.dumps(result))
+            results.append(result)
+
+    if len(results) == 2 and results[0]['reads_per_second']:
+        ratio = results[1]['reads_per_second'] / results[0]['reads_per_second']
+        print(f"{results[1]['profile']} vs {results[0]['profile']}: {ratio:.2f}x read throughput")
+
+
+if __name__ == '__main__':
+    main()
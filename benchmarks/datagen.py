@@ -0,0 +1,237 @@
+"""
+Synthetic trade journal generator with bulk inserts
+
+Trades follow a weighted symbol mix with per-symbol price levels, entry
+times clustered in the Asian/London/New York sessions, a configurable
+share of open trades, and chart images on a fraction of trades. Rows go
+in with executemany INSERTs in large batches; the account_stats/daily_pnl
+aggregates are rebuilt once at the end.
+
+    python -m benchmarks.datagen --trades 100000 --db /tmp/bench.db
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent / 'backend'
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+# symbol -> (weight, typical price, daily volatility as a fraction of price)
+SYMBOLS = {
+    'EURUSD': (30, 1.09, 0.004),
+    'GBPUSD': (20, 1.27, 0.005),
+    'USDJPY': (15, 148.0, 0.005),
+    'XAUUSD': (15, 2000.0, 0.008),
+    'AUDUSD': (10, 0.66, 0.005),
+    'US30': (10, 37000.0, 0.007),
+}
+# session -> (weight, first UTC hour, last UTC hour)
+SESSIONS = {
+    'ASIAN': (20, 0, 6),
+    'LONDON': (35, 7, 11),
+    'OVERLAP': (25, 12, 15),
+    'NEW_YORK': (20, 16, 21),
+}
+MARKET_CONDITIONS = ['TRENDING', 'RANGING', 'VOLATILE']
+IMAGE_TYPES = ['CHART', 'ENTRY', 'EXIT', 'ANALYSIS']
+VIDEO_CATEGORIES = ['Tutorial', 'Analysis', 'Strategy']
+
+
+def _weighted(table):
+    names = list(table)
+    return names, [table[name][0] for name in names]
+
+
+def generate_trades(count, start_id=1, accounts=(None,), open_ratio=0.05,
+                    days=730, seed=42, now=None):
+    """Yield Trade column dicts with ids start_id, start_id + 1, ..."""
+    from repository import calculate_pnl, calculate_confluence
+
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    first_day = now - timedelta(days=days)
+    symbols, symbol_weights = _weighted(SYMBOLS)
+    sessions, session_weights = _weighted(SESSIONS)
+
+    for offset in range(count):
+        symbol = rng.choices(symbols, symbol_weights)[0]
+        session = rng.choices(sessions, session_weights)[0]
+        _, price, volatility = SYMBOLS[symbol]
+        _, first_hour, last_hour = SESSIONS[session]
+
+        # Trades are spread evenly over the period, in id order
+        day = first_day + timedelta(days=offset * days / count)
+        entry_time = day.replace(hour=rng.randint(first_hour, last_hour),
+                                 minute=rng.randrange(60), second=rng.randrange(60),
+                                 microsecond=0)
+        direction = rng.choice(('LONG', 'SHORT'))
+        entry = round(price * (1 + rng.gauss(0, 0.05)), 5)
+        # P&L uses a fixed 100k contract, so scale lots down for high-priced symbols
+        lot_size = round(rng.choice((0.01, 0.05, 0.1, 0.2, 0.5, 1.0)) * min(1, 1.5 / price), 6)
+        risk = entry * volatility * rng.uniform(0.2, 1.0)
+        stop_loss = round(entry - risk if direction == 'LONG' else entry + risk, 5)
+        timeframes = [rng.randint(0, 10) for _ in range(5)]
+
+        is_open = rng.random() < open_ratio
+        exit_price = None
+        closed_at = None
+        duration = None
+        if not is_open:
+            # Slight positive edge: average result around +0.1R
+            move = rng.gauss(0.1, 1.2) * risk
+            exit_price = round(entry + move if direction == 'LONG' else entry - move, 5)
+            duration = int(rng.expovariate(1 / 240)) + 1
+            closed_at = entry_time + timedelta(minutes=duration)
+
+        pnl = calculate_pnl(direction, entry, exit_price, lot_size)
+        yield {
+            'id': start_id + offset,
+            'account_id': rng.choice(accounts),
+            'symbol': symbol,
+            'direction': direction,
+            'entry_price': entry,
+            'exit_price': exit_price,
+            'lot_size': lot_size,
+            'status': 'OPEN' if is_open else 'CLOSED',
+            'stop_loss': stop_loss,
+            'weekly_tf': timeframes[0],
+            'daily_tf': timeframes[1],
+            'h4_tf': timeframes[2],
+            'h1_tf': timeframes[3],
+            'lower_tf': timeframes[4],
+            'total_confluence': calculate_confluence(*timeframes),
+            'risk_reward': round(rng.uniform(0.5, 4), 1),
+            'session': session,
+            'market_condition': rng.choice(MARKET_CONDITIONS),
+            'setup_quality': rng.randint(1, 10),
+            'execution_quality': rng.randint(1, 10),
+            'notes': f'{session.title()} session {symbol} setup' if rng.random() < 0.3 else None,
+            'pnl': pnl,
+            'duration_minutes': duration,
+            'created_at': entry_time,
+            'entry_time': entry_time,
+            'closed_at': closed_at,
+            'exit_time': closed_at,
+        }
+
+
+def generate_images(trades, image_ratio, rng):
+    """Image rows for a share of the given trades (1-3 each)"""
+    for trade in trades:
+        if rng.random() >= image_ratio:
+            continue
+        for n in range(rng.randint(1, 3)):
+            yield {
+                'trade_id': trade['id'],
+                'image_url': f"/uploads/trades/{trade['id']}_{n}.png",
+                'image_type': IMAGE_TYPES[n % len(IMAGE_TYPES)],
+                'uploaded_at': trade['created_at'],
+            }
+
+
+def seed(db, trades, videos=100, accounts=3, open_ratio=0.05, image_ratio=0.3,
+         batch_size=10000, seed=42):
+    """Bulk-insert synthetic accounts, trades, images and videos into a session
+
+    Returns a report with row counts and timings.
+    """
+    from sqlalchemy import insert, func
+    from models import Trade, TradeImage, TradingAccount, Video
+    from aggregates import rebuild_account_stats, rebuild_daily_pnl
+    from etags import bump_data_version
+
+    started = time.perf_counter()
+    rng = random.Random(seed)
+
+    account_ids = []
+    for n in range(accounts):
+        account = TradingAccount(name=f'Synthetic {n + 1}', account_type='DEMO', broker='Bench')
+        db.add(account)
+        db.flush()
+        account_ids.append(account.id)
+
+    start_id = (db.query(func.max(Trade.id)).scalar() or 0) + 1
+    rows = generate_trades(trades, start_id, account_ids or (None,), open_ratio, seed=seed)
+    inserted = images = 0
+    while True:
+        batch = [row for _, row in zip(range(batch_size), rows)]
+        if not batch:
+            break
+        db.execute(insert(Trade), batch)
+        image_rows = list(generate_images(batch, image_ratio, rng))
+        if image_rows:
+            db.execute(insert(TradeImage), image_rows)
+        db.commit()
+        inserted += len(batch)
+        images += len(image_rows)
+    insert_seconds = time.perf_counter() - started
+
+    if videos:
+        db.execute(insert(Video), [{
+            'title': f'Synthetic video {n + 1}',
+            'description': 'Generated for benchmarks',
+            'video_url': f'https://example.com/videos/{n + 1}',
+            'category': VIDEO_CATEGORIES[n % len(VIDEO_CATEGORIES)],
+            'duration': f'{rng.randint(3, 45)}:{rng.randrange(60):02d}',
+            'is_featured': n % 10 == 0,
+            'view_count': 0,
+            'created_at': datetime.utcnow(),
+        } for n in range(videos)])
+
+    rebuild_account_stats(db)
+    rebuild_daily_pnl(db)
+    bump_data_version(db, 'trades')
+    bump_data_version(db, 'videos')
+    db.commit()
+
+    elapsed = time.perf_counter() - started
+    return {
+        'trades': inserted,
+        'images': images,
+        'videos': videos,
+        'accounts': len(account_ids),
+        'insert_seconds': round(insert_seconds, 2),
+        'total_seconds': round(elapsed, 2),
+        'trades_per_second': round(inserted / insert_seconds, 1) if insert_seconds else 0,
+    }
+
+
+def parse_size(value):
+    """Accept 10k/100k/1m presets or a plain number"""
+    return SIZES.get(value.lower()) or int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--trades', type=parse_size, default=10_000, help='count or 10k/100k/1m')
+    parser.add_argument('--db', help='SQLite file to seed (default: DB_PATH / DATABASE_URL)')
+    parser.add_argument('--videos', type=int, default=100)
+    parser.add_argument('--accounts', type=int, default=3)
+    parser.add_argument('--open-ratio', type=float, default=0.05)
+    parser.add_argument('--image-ratio', type=float, default=0.3)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if args.db:
+        os.environ['DB_PATH'] = args.db
+        os.environ['DATABASE_URL'] = ''
+    sys.path.insert(0, str(BACKEND_DIR))
+    from database import db_config
+    import models  # noqa: F401  (registers the tables on Base.metadata)
+
+    db_config.create_tables()
+    with db_config.SessionLocal() as db:
+        report = seed(db, args.trades, args.videos, args.accounts, args.open_ratio,
+                      args.image_ratio, args.batch_size, args.seed)
+    print(json.dumps(report))
+
+
+if __name__ == '__main__':
+    main()
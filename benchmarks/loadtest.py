@@ -0,0 +1,361 @@
+"""
+Concurrent load test over every /api/trades* and /api/videos* route
+
+For each dataset size a fresh SQLite database is seeded with
+benchmarks.datagen, the full app is started under gunicorn, and N
+keep-alive clients run a weighted mix of reads and writes for a fixed
+time. Writes only touch trades and videos the client created itself, so
+the seeded data stays comparable across runs. Results (per-route and
+overall p50/p95/p99 latency, throughput, errors and the server's peak
+RSS) are printed as JSON and optionally written to --output.
+
+    python -m benchmarks.loadtest --sizes 10k,100k --clients 16 --seconds 30
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.datagen import parse_size
+
+PROJECT_ROOT = Path(__file__).parent.parent
+BACKEND_DIR = PROJECT_ROOT / 'backend'
+
+# route name -> weight in the request mix
+ROUTE_WEIGHTS = {
+    'trades_page': 10,
+    'trades_cursor_page': 5,
+    'trades_fields': 5,
+    'trade_get': 10,
+    'trade_create': 5,
+    'trade_update': 3,
+    'trade_close': 2,
+    'trade_delete': 2,
+    'trades_import': 1,
+    'trades_export': 1,
+    'stats_account': 8,
+    'stats_metrics': 8,
+    'stats_daily': 5,
+    'stats_monthly': 5,
+    'stats_advanced': 2,
+    'dashboard_snapshot': 5,
+    'videos_list': 5,
+    'video_get': 5,
+    'video_create': 1,
+    'video_update': 1,
+    'video_delete': 1,
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(latencies, errors, seconds):
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / seconds, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def trade_payload(rng):
+    return {
+        'symbol': rng.choice(['EURUSD', 'GBPUSD', 'USDJPY']),
+        'direction': rng.choice(['LONG', 'SHORT']),
+        'entry_price': 1.1,
+        'lot_size': 0.1,
+        'weekly_tf': rng.randint(0, 10),
+        'h4_tf': rng.randint(0, 10),
+    }
+
+
+def video_payload(rng):
+    return {
+        'title': f'Load test video {rng.randrange(10 ** 6)}',
+        'video_url': 'https://example.com/video',
+        'category': 'Tutorial',
+    }
+
+
+class Client:
+    """One keep-alive connection running the weighted route mix"""
+
+    def __init__(self, port, seed, context):
+        self.port = port
+        self.rng = random.Random(seed)
+        self.context = context
+        self.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+        self.trade_ids = []
+        self.video_ids = []
+
+    def request(self, method, path, body=None, content_type='application/json'):
+        headers = {}
+        if body is not None:
+            headers['Content-Type'] = content_type
+            if not isinstance(body, (bytes, str)):
+                body = json.dumps(body)
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=120)
+            return 0, b''
+        return response.status, data
+
+    def run_route(self, route):
+        """Issue one request for a route; returns True on the expected status"""
+        rng, ctx = self.rng, self.context
+
+        if route in ('trade_update', 'trade_close', 'trade_delete') and not self.trade_ids:
+            route = 'trade_create'
+        if route in ('video_update', 'video_delete') and not self.video_ids:
+            route = 'video_create'
+
+        if route == 'trades_page':
+            status, _ = self.request('GET', '/api/trades?limit=100')
+        elif route == 'trades_cursor_page':
+            status, _ = self.request('GET', f"/api/trades?limit=100&cursor={ctx['cursor']}")
+        elif route == 'trades_fields':
+            status, _ = self.request('GET', '/api/trades?limit=1000&fields=id,symbol,pnl,status')
+        elif route == 'trade_get':
+            status, _ = self.request('GET', f"/api/trades/{rng.randint(1, ctx['max_trade_id'])}")
+        elif route == 'trade_create':
+            status, data = self.request('POST', '/api/trades', trade_payload(rng))
+            if status == 201:
+                self.trade_ids.append(json.loads(data)['id'])
+            return status == 201
+        elif route == 'trade_update':
+            status, _ = self.request('PUT', f'/api/trades/{rng.choice(self.trade_ids)}',
+                                     {'notes': 'updated', 'daily_tf': rng.randint(0, 10)})
+        elif route == 'trade_close':
+            status, _ = self.request('POST', f'/api/trades/{rng.choice(self.trade_ids)}/close',
+                                     {'exit_price': round(1.1 + rng.uniform(-0.01, 0.01), 5)})
+        elif route == 'trade_delete':
+            status, _ = self.request('DELETE', f'/api/trades/{self.trade_ids.pop()}')
+            return status == 204
+        elif route == 'trades_import':
+            rows = '\n'.join(json.dumps(trade_payload(rng)) for _ in range(100))
+            status, _ = self.request('POST', '/api/trades/import?format=ndjson', rows,
+                                     'application/x-ndjson')
+        elif route == 'trades_export':
+            status, _ = self.request('GET', f"/api/trades/export?format=ndjson&start={ctx['export_start']}")
+        elif route == 'stats_monthly':
+            status, _ = self.request('GET', f"/api/trades/stats/monthly?year={ctx['year']}&month={ctx['month']}")
+        elif route.startswith('stats_'):
+            status, _ = self.request('GET', f"/api/trades/stats/{route[len('stats_'):]}")
+        elif route == 'dashboard_snapshot':
+            status, _ = self.request('GET', '/api/dashboard/snapshot')
+        elif route == 'videos_list':
+            status, _ = self.request('GET', '/api/videos')
+        elif route == 'video_get':
+            status, _ = self.request('GET', f"/api/videos/{rng.randint(1, ctx['videos'])}")
+        elif route == 'video_create':
+            status, data = self.request('POST', '/api/videos', video_payload(rng))
+            if status == 201:
+                self.video_ids.append(json.loads(data)['id'])
+            return status == 201
+        elif route == 'video_update':
+            status, _ = self.request('PUT', f'/api/videos/{rng.choice(self.video_ids)}',
+                                     {'description': 'updated'})
+        elif route == 'video_delete':
+            status, _ = self.request('DELETE', f'/api/videos/{self.video_ids.pop()}')
+        else:
+            raise ValueError(f'Unknown route {route}')
+        return status == 200
+
+
+def drive(port, clients, seconds, context, seed=0):
+    """Run the route mix from concurrent clients and collect per-route latencies"""
+    routes = list(ROUTE_WEIGHTS)
+    weights = [ROUTE_WEIGHTS[route] for route in routes]
+    latencies = {route: [] for route in routes}
+    errors = {route: 0 for route in routes}
+    lock = threading.Lock()
+    deadline = time.time() + seconds
+
+    def worker(n):
+        client = Client(port, seed + n, context)
+        local = {route: [] for route in routes}
+        local_errors = {route: 0 for route in routes}
+        while time.time() < deadline:
+            route = client.rng.choices(routes, weights)[0]
+            started = time.perf_counter()
+            ok = client.run_route(route)
+            if ok:
+                local[route].append(time.perf_counter() - started)
+            else:
+                local_errors[route] += 1
+        with lock:
+            for route in routes:
+                latencies[route].extend(local[route])
+                errors[route] += local_errors[route]
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    every = [value for values in latencies.values() for value in values]
+    return {
+        'routes': {route: summarize(latencies[route], errors[route], seconds) for route in routes},
+        'overall': summarize(every, sum(errors.values()), seconds),
+    }
+
+
+def process_tree(pid):
+    """pid plus all descendants (Linux /proc)"""
+    pids = [pid]
+    for current in pids:
+        try:
+            for task in os.listdir(f'/proc/{current}/task'):
+                with open(f'/proc/{current}/task/{task}/children') as f:
+                    pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return pids
+
+
+def peak_rss_mb(pid):
+    """Largest VmHWM (peak resident set) among the server's processes"""
+    peaks = []
+    for child in process_tree(pid):
+        try:
+            with open(f'/proc/{child}/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        peaks.append(int(line.split()[1]) / 1024)
+        except OSError:
+            pass
+    return round(max(peaks), 1) if peaks else None
+
+
+def wait_until_ready(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', '/api/trades/stats/account')
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+def warm_context(port, videos):
+    """Values the route mix needs: a valid cursor, the id range, dates"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+    conn.request('GET', '/api/trades?limit=100&fields=id')
+    response = conn.getresponse()
+    first_page = json.loads(response.read())
+    cursor = response.getheader('X-Next-Cursor') or ''
+    now = datetime.utcnow()
+    return {
+        'cursor': cursor,
+        'max_trade_id': max((row['id'] for row in first_page), default=1),
+        'videos': max(videos, 1),
+        'export_start': (now - timedelta(days=7)).date().isoformat(),
+        'year': now.year,
+        'month': now.month,
+    }
+
+
+def run_size(size, args, tmp):
+    db_path = Path(tmp) / f'loadtest_{size}.db'
+    env = dict(os.environ, DB_PATH=str(db_path), DATABASE_URL='', TRADE_BACKEND='sql',
+               SQLITE_PROFILE=args.sqlite_profile, FLASK_ENV='production')
+
+    seeding = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.datagen', '--trades', str(size),
+         '--videos', str(args.videos)],
+        env=dict(env, PYTHONPATH=str(PROJECT_ROOT)), cwd=PROJECT_ROOT,
+        check=True, capture_output=True, text=True
+    )
+    seed_report = json.loads(seeding.stdout.strip().splitlines()[-1])
+
+    port = free_port()
+    server = subprocess.Popen(
+        ['gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(args.workers),
+         '--worker-class', 'gthread', '--threads', str(args.threads),
+         '--timeout', '300', '--chdir', str(BACKEND_DIR), 'app:app'],
+        env=env, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(port)
+        context = warm_context(port, args.videos)
+        result = drive(port, args.clients, args.seconds, context)
+        result['peak_rss_mb'] = peak_rss_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+
+    if result['peak_rss_mb'] is None:
+        # No /proc: fall back to the largest reaped descendant (includes the seeder)
+        result['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1)
+
+    return {
+        'trades': size,
+        'seed': seed_report,
+        'clients': args.clients,
+        'seconds': args.seconds,
+        'workers': args.workers,
+        'threads': args.threads,
+        **result,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10k', help='comma-separated counts or 10k/100k/1m')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--videos', type=int, default=100)
+    parser.add_argument('--sqlite-profile', default='production')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args()
+
+    results = {
+        'started_at': datetime.utcnow().isoformat(),
+        'python': sys.version.split()[0],
+        'runs': [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes.split(','):
+            run = run_size(parse_size(size), args, tmp)
+            results['runs'].append(run)
+            print(json.dumps(run), flush=True)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
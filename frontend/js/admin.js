@@ -266,15 +266,12 @@ window.backupDatabase = async function() {
 
 window.exportTrades = async function() {
     try {
-        const trades = await fetch('/api/trades').then(r => r.json());
-        const csv = this.convertToCSV(trades);
-        const blob = new Blob([csv], { type: 'text/csv' });
-        const url = window.URL.createObjectURL(blob);
+        // The server streams the file; let the browser download it directly
         const a = document.createElement('a');
-        a.href = url;
+        a.href = '/api/trades/export?format=csv';
         a.download = `trades_export_${new Date().toISOString().split('T')[0]}.csv`;
         a.click();
-        adminPanel.showNotification('Trades exported successfully', 'success');
+        adminPanel.showNotification('Trades export started', 'success');
     } catch (error) {
         console.error('Export error:', error);
         adminPanel.showNotification('Export failed', 'error');
@@ -41,6 +41,22 @@ class ApiClient {
         return this.request('/trades');
     }
 
+    // Keyset-paginated, optionally projected trade list
+    async getTradesPage({ limit = 50, cursor = null, fields = null } = {}) {
+        const params = new URLSearchParams({ limit });
+        if (cursor) params.set('cursor', cursor);
+        if (fields) params.set('fields', fields.join(','));
+
+        const response = await fetch(`${this.baseURL}/trades?${params}`);
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        return {
+            trades: await response.json(),
+            nextCursor: response.headers.get('X-Next-Cursor')
+        };
+    }
+
     async getTrade(id) {
         return this.request(`/trades/${id}`);
     }
@@ -85,6 +101,11 @@ class ApiClient {
         return this.request('/trades/stats/daily');
     }
 
+    // Account stats, metrics, daily series and recent trades in one request
+    async getDashboardSnapshot() {
+        return this.request('/dashboard/snapshot');
+    }
+
     async getMonthlyStats(year, month) {
         return this.request(`/trades/stats/monthly?year=${year}&month=${month}`);
     }
@@ -12,18 +12,13 @@ class Dashboard {
 
     async loadDashboardData() {
         try {
-            // Load all dashboard data
-            const [accountStats, metrics, dailyStats, trades] = await Promise.all([
-                api.getAccountStats(),
-                api.getMetrics(),
-                api.getDailyStats(),
-                api.getTrades()
-            ]);
-
-            this.updateAccountSummary(accountStats);
-            this.updateMetrics(metrics);
-            this.updateConfluence(trades);
-            this.updateChart(dailyStats);
+            // Load all dashboard data in a single round trip
+            const snapshot = await api.getDashboardSnapshot();
+
+            this.updateAccountSummary(snapshot.account);
+            this.updateMetrics(snapshot.metrics);
+            this.updateConfluence(snapshot.open_trades);
+            this.updateChart(snapshot.daily);
         } catch (error) {
             console.error('Failed to load dashboard data:', error);
             this.showError('Failed to load dashboard data');
@@ -237,7 +237,7 @@ document.addEventListener('DOMContentLoaded', () => {{
     @app.route('/api/{endpoint_name}', methods=['{method}'])
     def {endpoint_name.replace('-', '_')}():
         """Handle {endpoint_name} requests"""
-        db = next(get_db())
+        db = get_request_db()
         
         try:
             # Add your logic here
@@ -338,6 +338,23 @@ class {model_name}(Base):
         print("✅ Migrations completed successfully")
         return True
 
+    def rebuild_stats(self):
+        """Recompute persisted trade aggregates from the trades table"""
+        print("📊 Rebuilding trade statistics...")
+        
+        sys.path.insert(0, str(self.backend_dir))
+        from database import db_config
+        from aggregates import rebuild_account_stats, rebuild_daily_pnl
+        
+        db_config.create_tables()
+        with db_config.SessionLocal() as db:
+            accounts = rebuild_account_stats(db)
+            days = rebuild_daily_pnl(db)
+        
+        print(f"✅ Rebuilt account stats ({accounts} account buckets)")
+        print(f"✅ Backfilled daily P&L ({days} account-days)")
+        return True
+
     def backup_project(self):
         """Create full project backup"""
         print("💾 Creating project backup...")
@@ -370,6 +387,7 @@ API MANAGEMENT:
 DATABASE MANAGEMENT:
   add-model <name> <fields>       - Create new database model
   migrate                         - Run database migrations
+  rebuild-stats                   - Recompute/backfill persisted trade statistics
   backup-db                       - Backup database
 
 PROJECT MANAGEMENT:
@@ -421,6 +439,9 @@ def main():
         elif command == 'migrate':
             manager.run_migrations()
             
+        elif command == 'rebuild-stats':
+            manager.rebuild_stats()
+            
         elif command == 'backup':
             manager.backup_project()
             
@@ -0,0 +1,17 @@
+"""
+Shared test setup: backend modules on sys.path and a throwaway SQLite DB
+
+database.py reads its configuration at import time, so the environment is
+set here before any test module imports it.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ['DB_PATH'] = str(Path(_tmp.name) / 'test.db')
+os.environ['DATABASE_URL'] = ''
+os.environ['TRADE_BACKEND'] = 'sql'
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
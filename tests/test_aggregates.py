@@ -0,0 +1,144 @@
+"""
+Persisted trade aggregates stay unique per scope and consistent with trades
+"""
+from datetime import date, datetime
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Query
+from database import db_config
+from models import Trade, AccountStats, DailyPnl, NO_ACCOUNT
+from aggregates import (apply_trade_change, snapshot_trade, ensure_aggregates,
+                        rebuild_account_stats, rebuild_daily_pnl, get_account_stats_row,
+                        query_daily_pnl)
+
+
+@pytest.fixture
+def db():
+    db_config.create_tables()
+    session = db_config.SessionLocal()
+    session.query(Trade).delete()
+    rebuild_account_stats(session)
+    rebuild_daily_pnl(session)
+    yield session
+    session.rollback()
+    session.query(Trade).delete()
+    session.commit()
+    session.close()
+
+
+def add_trade(db, **fields):
+    trade = Trade(symbol='EURUSD', direction='LONG', entry_price=1.1, lot_size=1, **fields)
+    db.add(trade)
+    apply_trade_change(db, None, snapshot_trade(trade))
+    db.commit()
+    return trade
+
+
+def test_global_and_no_account_rows_use_the_sentinel(db):
+    add_trade(db, status='CLOSED', pnl=50)
+    add_trade(db, status='CLOSED', pnl=-20, account_id=7)
+
+    scopes = {(row.is_global, row.account_id): row.total_pnl for row in db.query(AccountStats)}
+    assert scopes == {(True, NO_ACCOUNT): 30, (False, NO_ACCOUNT): 50, (False, 7): -20}
+    assert get_account_stats_row(db).total_pnl == 30
+    assert get_account_stats_row(db, 7).total_pnl == -20
+
+
+def test_duplicate_scope_rows_are_rejected(db):
+    add_trade(db, status='OPEN', account_id=3)
+
+    db.add(AccountStats(is_global=False, account_id=3))
+    with pytest.raises(Exception):
+        db.commit()
+
+
+def test_insert_conflict_falls_back_to_update(db, monkeypatch):
+    add_trade(db, status='CLOSED', pnl=10, account_id=4)
+
+    # Simulate a concurrent writer: the row exists, but this writer's first
+    # UPDATE ran before it was committed and matched nothing
+    original_update = Query.update
+    calls = []
+
+    def first_update_misses(self, values, **kwargs):
+        calls.append(values)
+        if len(calls) == 1:
+            return 0
+        return original_update(self, values, **kwargs)
+
+    monkeypatch.setattr(Query, 'update', first_update_misses)
+    trade = Trade(symbol='EURUSD', direction='LONG', entry_price=1.1, lot_size=1,
+                  status='CLOSED', pnl=5, account_id=4)
+    db.add(trade)
+    apply_trade_change(db, None, snapshot_trade(trade))
+    db.commit()
+    monkeypatch.undo()
+
+    rows = db.query(AccountStats).filter_by(is_global=False, account_id=4).all()
+    assert [(row.closed_trades, row.total_pnl) for row in rows] == [(2, 15)]
+
+
+def test_ensure_aggregates_converts_null_account_rows(db):
+    add_trade(db, status='CLOSED', pnl=25)
+    with db_config.engine.begin() as conn:
+        # The schema and rows of a database from before NO_ACCOUNT, including
+        # a duplicate left behind by the old update-then-insert race
+        conn.execute(text('DROP TABLE account_stats'))
+        conn.execute(text(
+            'CREATE TABLE account_stats (id INTEGER PRIMARY KEY, account_id INTEGER, '
+            'is_global BOOLEAN NOT NULL, closed_trades INTEGER NOT NULL, '
+            'open_trades INTEGER NOT NULL, winning_trades INTEGER NOT NULL, '
+            'total_pnl FLOAT NOT NULL, updated_at DATETIME)'
+        ))
+        conn.execute(text(
+            'INSERT INTO account_stats (is_global, account_id, closed_trades, open_trades, '
+            'winning_trades, total_pnl) VALUES (1, NULL, 1, 0, 1, 25), '
+            '(0, NULL, 1, 0, 1, 25), (0, NULL, 1, 0, 1, 25)'
+        ))
+
+    db_config.create_tables()
+    ensure_aggregates(db)
+
+    rows = [(row.is_global, row.account_id, row.total_pnl) for row in db.query(AccountStats)]
+    assert sorted(rows) == [(False, NO_ACCOUNT, 25), (True, NO_ACCOUNT, 25)]
+    indexes = {index['name'] for index in inspect(db_config.engine).get_indexes('account_stats')}
+    assert 'uq_account_stats_scope' in indexes
+
+
+def test_daily_rows_are_unique_per_account_and_date(db):
+    closed_at = datetime(2024, 3, 1, 15)
+    add_trade(db, status='CLOSED', pnl=10, closed_at=closed_at)
+    add_trade(db, status='CLOSED', pnl=-4, closed_at=closed_at)
+    add_trade(db, status='CLOSED', pnl=7, closed_at=closed_at, account_id=2)
+
+    rows = {(row.account_id, row.date): row.pnl for row in db.query(DailyPnl)}
+    assert rows == {(NO_ACCOUNT, date(2024, 3, 1)): 6, (2, date(2024, 3, 1)): 7}
+    assert query_daily_pnl(db) == [(date(2024, 3, 1), 13, 3)]
+
+    db.add(DailyPnl(account_id=NO_ACCOUNT, date=date(2024, 3, 1)))
+    with pytest.raises(Exception):
+        db.commit()
+
+
+def test_ensure_aggregates_converts_null_daily_rows(db):
+    add_trade(db, status='CLOSED', pnl=12, closed_at=datetime(2024, 3, 2, 9))
+    with db_config.engine.begin() as conn:
+        # Legacy schema: nullable account_id, no unique index, duplicate rows
+        conn.execute(text('DROP TABLE daily_pnl'))
+        conn.execute(text(
+            'CREATE TABLE daily_pnl (id INTEGER PRIMARY KEY, account_id INTEGER, '
+            'date DATE NOT NULL, pnl FLOAT NOT NULL, trade_count INTEGER NOT NULL, '
+            'wins INTEGER NOT NULL, losses INTEGER NOT NULL)'
+        ))
+        conn.execute(text(
+            "INSERT INTO daily_pnl (account_id, date, pnl, trade_count, wins, losses) "
+            "VALUES (NULL, '2024-03-02', 12, 1, 1, 0), (NULL, '2024-03-02', 12, 1, 1, 0)"
+        ))
+
+    db_config.create_tables()
+    ensure_aggregates(db)
+
+    rows = [(row.account_id, row.date, row.pnl) for row in db.query(DailyPnl)]
+    assert rows == [(NO_ACCOUNT, date(2024, 3, 2), 12)]
+    indexes = {index['name'] for index in inspect(db_config.engine).get_indexes('daily_pnl')}
+    assert 'uq_daily_pnl_account_date' in indexes
@@ -0,0 +1,84 @@
+"""
+Concurrent writes to one trade apply their aggregate deltas exactly once
+"""
+import threading
+import time
+import pytest
+import sql_repository
+from database import db_config
+from models import Trade, TradeImage, DailyPnl
+from aggregates import rebuild_account_stats, rebuild_daily_pnl, get_account_stats_row
+from sql_repository import SqlTradeRepository
+from trade_api import create_app
+
+
+@pytest.fixture
+def client():
+    app = create_app(SqlTradeRepository())
+    with db_config.SessionLocal() as db:
+        db.query(TradeImage).delete()
+        db.query(Trade).delete()
+        db.commit()
+        rebuild_account_stats(db)
+        rebuild_daily_pnl(db)
+    return app.test_client()
+
+
+def interleave(monkeypatch, first, second):
+    """Run first until it has read the trade, then second, then let first finish"""
+    first_read = threading.Event()
+    original = sql_repository.updated_trade_fields
+
+    def pause_first_writer(*args):
+        if not first_read.is_set():
+            first_read.set()
+            time.sleep(0.3)  # Second writer reads the trade now unless it is locked
+        return original(*args)
+
+    monkeypatch.setattr(sql_repository, 'updated_trade_fields', pause_first_writer)
+    responses = []
+    thread = threading.Thread(target=lambda: responses.append(first()))
+    thread.start()
+    assert first_read.wait(5)
+    responses.append(second())
+    thread.join()
+    return responses
+
+
+def test_concurrent_closes_count_the_trade_once(client, monkeypatch):
+    trade = client.post('/api/trades', json={
+        'symbol': 'EURUSD', 'direction': 'LONG', 'entry_price': 1.1, 'lot_size': 1
+    }).json
+
+    def close():
+        return client.post(f"/api/trades/{trade['id']}/close", json={'exit_price': 1.2}).status_code
+
+    assert interleave(monkeypatch, close, close) == [200, 200]
+
+    with db_config.SessionLocal() as db:
+        stats = get_account_stats_row(db)
+        assert (stats.open_trades, stats.closed_trades) == (0, 1)
+        assert stats.total_pnl == pytest.approx(10000)
+        assert [row.trade_count for row in db.query(DailyPnl)] == [1]
+
+
+def test_concurrent_deletes_remove_the_trade_once(client):
+    trade = client.post('/api/trades', json={
+        'symbol': 'EURUSD', 'direction': 'LONG', 'entry_price': 1.1, 'lot_size': 1
+    }).json
+    start = threading.Barrier(2)
+    statuses = []
+
+    def delete():
+        start.wait()
+        statuses.append(client.delete(f"/api/trades/{trade['id']}").status_code)
+
+    threads = [threading.Thread(target=delete) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [204, 404]
+    with db_config.SessionLocal() as db:
+        assert get_account_stats_row(db).open_trades == 0
@@ -0,0 +1,118 @@
+"""
+Streamed imports validate rows and report rejected ones without aborting
+"""
+import codecs
+import io
+from datetime import datetime
+from importer import import_trades
+from repository import WriteRejected
+
+
+class RecordingRepository:
+    def __init__(self):
+        self.trades = []
+
+    def insert_trades(self, trades):
+        self.trades.extend(trades)
+
+
+def run_import(body, fmt):
+    repository = RecordingRepository()
+    return import_trades(repository, io.BytesIO(body), fmt), repository.trades
+
+
+def test_csv_header_after_a_bom_is_recognised():
+    body = codecs.BOM_UTF8 + b'symbol,direction,entry_price,lot_size\nEURUSD,LONG,1.1,1\n'
+
+    report, trades = run_import(body, 'csv')
+
+    assert (report['imported'], report['failed']) == (1, 0)
+    assert trades[0]['symbol'] == 'EURUSD'
+
+
+def test_undecodable_csv_row_is_reported_not_raised():
+    body = (
+        b'symbol,direction,entry_price,lot_size,notes\n'
+        b'EURUSD,LONG,1.1,1,caf\xe9\n'
+        b'GBPUSD,SHORT,1.3,1,"two\nlines"\n'
+        b'USDJPY,LONG,150,1,ok\n'
+    )
+
+    report, trades = run_import(body, 'csv')
+
+    assert (report['imported'], report['failed']) == (2, 1)
+    assert report['errors'] == [{'row': 1, 'error': 'Row is not valid UTF-8'}]
+    assert [trade['symbol'] for trade in trades] == ['GBPUSD', 'USDJPY']
+
+
+def test_undecodable_ndjson_line_is_reported_not_raised():
+    body = (
+        codecs.BOM_UTF8 + b'{"symbol": "EURUSD", "direction": "LONG", "entry_price": 1.1, "lot_size": 1}\n'
+        b'{"symbol": "\xff", "direction": "LONG", "entry_price": 1.1, "lot_size": 1}\n'
+    )
+
+    report, trades = run_import(body, 'ndjson')
+
+    assert (report['imported'], report['failed']) == (1, 1)
+    assert report['errors'] == [{'row': 2, 'error': 'Line is not valid UTF-8'}]
+
+
+def test_non_finite_numbers_are_row_errors():
+    body = (
+        b'symbol,direction,entry_price,lot_size,exit_price,daily_tf\n'
+        b'EURUSD,LONG,1.1,1,nan,0\n'
+        b'EURUSD,LONG,1.1,1,,inf\n'
+        b'EURUSD,LONG,1.1,1,1.2,1\n'
+    )
+
+    report, trades = run_import(body, 'csv')
+
+    assert (report['imported'], report['failed']) == (1, 2)
+    assert [error['error'] for error in report['errors']] == [
+        'exit_price must be a finite number', 'daily_tf must be a number'
+    ]
+
+
+class RejectingRepository(RecordingRepository):
+    """Rejects the second batch outright and row 0 of the third"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = 0
+
+    def insert_trades(self, trades):
+        self.batches += 1
+        if self.batches == 2:
+            raise WriteRejected('FOREIGN KEY constraint failed')
+        if self.batches == 3:
+            self.trades.extend(trades[1:])
+            raise WriteRejected('duplicate key', [0])
+        super().insert_trades(trades)
+
+
+def test_rejected_batches_are_reported_and_later_batches_stored():
+    rows = [b'{"symbol": "S%d", "direction": "LONG", "entry_price": 1, "lot_size": 1}' % i
+            for i in range(1, 7)]
+    repository = RejectingRepository()
+
+    report = import_trades(repository, io.BytesIO(b'\n'.join(rows)), 'ndjson', batch_size=2)
+
+    assert (report['imported'], report['failed']) == (3, 3)
+    assert [error['row'] for error in report['errors']] == [3, 4, 5]
+    assert report['errors'][0]['error'] == 'Not stored: FOREIGN KEY constraint failed'
+    assert [trade['symbol'] for trade in repository.trades] == ['S1', 'S2', 'S6']
+
+
+def test_timezone_aware_timestamps_are_stored_as_naive_utc():
+    body = (
+        b'{"symbol": "EURUSD", "direction": "LONG", "entry_price": 1.1, "lot_size": 1, '
+        b'"exit_price": 1.2, "created_at": "2024-01-01T09:00:00+01:00", '
+        b'"closed_at": "2024-01-01T23:30:00-05:00"}\n'
+    )
+
+    report, trades = run_import(body, 'ndjson')
+
+    assert report['imported'] == 1
+    assert trades[0]['created_at'] == datetime(2024, 1, 1, 8)
+    assert trades[0]['closed_at'] == datetime(2024, 1, 2, 4, 30)
+    assert trades[0]['closed_at'].tzinfo is None
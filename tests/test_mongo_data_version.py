@@ -0,0 +1,45 @@
+"""
+Mongo trade writes advance the data version that stats caches are keyed on
+"""
+import mongomock
+import pytest
+from mongo_repository import MongoTradeRepository
+from trade_api import create_app
+
+
+@pytest.fixture
+def repository():
+    return MongoTradeRepository(mongomock.MongoClient()['test']['trades'])
+
+
+def new_trade(**fields):
+    return dict(symbol='EURUSD', direction='LONG', entry_price=1.1, lot_size=1, **fields)
+
+
+def test_every_write_path_bumps_the_version(repository):
+    assert repository.data_version() == 0
+
+    trade = repository.create_trade(new_trade())
+    assert repository.data_version() == 1
+
+    repository.update_trade(trade['id'], {'notes': 'moved stop'})
+    repository.close_trade(trade['id'], 1.2)
+    assert repository.data_version() == 3
+
+    assert not repository.delete_trade('0' * 24)
+    assert repository.data_version() == 3
+    repository.delete_trade(trade['id'])
+    assert repository.data_version() == 4
+
+    repository.insert_trades([new_trade(status='OPEN')])
+    assert repository.data_version() == 5
+
+
+def test_cached_stats_see_writes_from_another_worker(repository):
+    client = create_app(repository).test_client()
+    assert client.get('/api/trades/stats/account').json['open_trades'] == 0
+
+    # Another worker shares the collection but not this process's cache
+    MongoTradeRepository(repository.collection).create_trade(new_trade())
+
+    assert client.get('/api/trades/stats/account').json['open_trades'] == 1
@@ -0,0 +1,47 @@
+"""
+Indexes added to models must reach databases created before them
+"""
+from datetime import datetime
+import pytest
+from sqlalchemy import event, inspect, text
+from database import db_config
+from models import Trade
+from pagination import keyset_page, encode_cursor
+
+
+def trade_indexes():
+    return {index['name'] for index in inspect(db_config.engine).get_indexes('trades')}
+
+
+@pytest.mark.parametrize('name', ['idx_trade_created_id', 'idx_trade_status_pnl'])
+def test_create_tables_backfills_missing_index(name):
+    db_config.create_tables()
+    with db_config.engine.begin() as conn:
+        conn.execute(text(f'DROP INDEX {name}'))
+    assert name not in trade_indexes()
+
+    db_config.create_tables()
+
+    assert name in trade_indexes()
+
+
+def test_keyset_page_reads_the_created_id_index():
+    db_config.create_tables()
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    with db_config.SessionLocal() as db:
+        event.listen(db_config.engine, 'before_cursor_execute', record)
+        try:
+            keyset_page(db.query(Trade.id), Trade, encode_cursor(datetime(2024, 1, 1), 10), 50)
+        finally:
+            event.remove(db_config.engine, 'before_cursor_execute', record)
+
+        statement, parameters = executed[-1]
+        plan = db.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+
+    details = ' '.join(str(row[-1]) for row in plan)
+    assert 'idx_trade_created_id' in details
+    assert 'TEMP B-TREE' not in details  # Pages are read in index order, not sorted
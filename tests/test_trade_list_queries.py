@@ -0,0 +1,75 @@
+"""
+GET /api/trades must not issue a query per trade (batched image loading)
+"""
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from database import db_config
+from models import Trade, TradeImage
+from sql_repository import SqlTradeRepository
+from trade_api import create_app
+
+TRADES = 25
+
+
+@pytest.fixture(scope='module')
+def client():
+    app = create_app(SqlTradeRepository())
+    with db_config.SessionLocal() as db:
+        db.query(TradeImage).delete()
+        db.query(Trade).delete()
+        for number in range(TRADES):
+            trade = Trade(symbol=f'SYM{number}', direction='LONG', entry_price=1.1, lot_size=1)
+            trade.images = [TradeImage(image_url=f'https://example.com/{number}/{i}.png')
+                            for i in range(2)]
+            db.add(trade)
+        db.commit()
+    return app.test_client()
+
+
+@contextmanager
+def count_statements():
+    """Collect the SQL statements executed on the read and write engines"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = {db_config.engine, db_config.read_engine}
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', record)
+
+
+def test_list_with_images_uses_two_statements(client):
+    with count_statements() as statements:
+        response = client.get('/api/trades')
+    
+    assert response.status_code == 200
+    assert len(response.json) == TRADES
+    assert all(len(trade['images']) == 2 for trade in response.json)
+    assert len(statements) == 2, statements  # trades + one IN query for images
+
+
+def test_list_without_images_uses_one_statement(client):
+    with count_statements() as statements:
+        response = client.get('/api/trades?include=')
+    
+    assert response.status_code == 200
+    assert len(response.json) == TRADES
+    assert all('images' not in trade for trade in response.json)
+    assert len(statements) == 1, statements
+
+
+def test_paged_list_with_images_uses_two_statements(client):
+    with count_statements() as statements:
+        response = client.get('/api/trades?limit=10')
+    
+    assert response.status_code == 200
+    assert len(response.json) == 10
+    assert response.headers['X-Next-Cursor']
+    assert len(statements) == 2, statements